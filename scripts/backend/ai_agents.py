@@ -1,26 +1,118 @@
-import requests
+import asyncio
 import json
-from typing import List, Dict, Optional
+import os
+import re
+import time
+from typing import Callable, List, Dict, Optional
 import random
+from collections import OrderedDict
+from llm_client import MODEL
+from llm_policy import get_llm_policy
+from metrics import LLM_FALLBACKS, record_llm_call
+from heuristic_scoring import HeuristicScorer, SCORE_KEYS
+from summarizer import TranscriptSummarizer
+from transcript import ParticipantStats, Transcript
+
+JSON_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+
+def partial_json_string(buffer: str, key: str) -> str:
+    """Extract the (possibly unterminated) string value of key from a partial JSON document"""
+    match = re.search(r'"%s"\s*:\s*"' % re.escape(key), buffer)
+    if not match:
+        return ""
+    
+    chars = []
+    i = match.end()
+    while i < len(buffer):
+        ch = buffer[i]
+        if ch == '"':
+            break
+        if ch == "\\":
+            # Stop at an escape sequence that hasn't fully arrived yet
+            if i + 1 >= len(buffer):
+                break
+            nxt = buffer[i + 1]
+            if nxt == "u":
+                if i + 6 > len(buffer):
+                    break
+                try:
+                    chars.append(chr(int(buffer[i + 2:i + 6], 16)))
+                except ValueError:
+                    # Malformed escape: stop here and leave it to the full parse
+                    break
+                i += 6
+                continue
+            chars.append(JSON_ESCAPES.get(nxt, nxt))
+            i += 2
+            continue
+        chars.append(ch)
+        i += 1
+    
+    return "".join(chars)
+
+
+TOPIC_CACHE_SIZE = 50
+# Recent topics listed in the prompt as ones to avoid
+TOPIC_AVOID_COUNT = 10
+
+
+class TopicCache:
+    """Recently announced GD topics, so parallel groups get different ones"""
+    
+    def __init__(self, max_size: int = TOPIC_CACHE_SIZE):
+        self.max_size = max_size
+        self._topics = OrderedDict()
+    
+    @staticmethod
+    def _key(topic: str) -> str:
+        return " ".join(topic.lower().split()).strip(" ?.!")
+    
+    def __contains__(self, topic: str) -> bool:
+        return self._key(topic) in self._topics
+    
+    def add(self, topic: str):
+        key = self._key(topic)
+        self._topics[key] = topic
+        self._topics.move_to_end(key)
+        while len(self._topics) > self.max_size:
+            self._topics.popitem(last=False)
+    
+    def recent(self, count: int = TOPIC_AVOID_COUNT) -> List[str]:
+        return list(self._topics.values())[-count:]
 
-API_KEY = "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"
-API_URL = "https://openrouter.ai/api/v1/chat/completions"
-MODEL = "qwen/qwen-2.5-7b-instruct"
 
 class AdminAgent:
     """AI Admin that moderates the GD"""
     
+    # Shared by every session in the process
+    recent_topics = TopicCache()
+    
     def __init__(self):
         self.name = "Admin"
         
-    async def announce_topic(self) -> Dict[str, str]:
-        """Generate GD topic and opening announcement"""
+    async def announce_topic(
+        self,
+        on_delta: Optional[Callable[[str], None]] = None,
+        retries: int = 0
+    ) -> Dict[str, str]:
+        """Generate GD topic and opening announcement
+        
+        When on_delta is given the completion is streamed and the announcement
+        text is forwarded as it arrives. A topic already used recently is
+        regenerated up to `retries` times.
+        """
+        
+        avoid = ""
+        recent = self.recent_topics.recent()
+        if recent:
+            avoid = "\nDo NOT use any of these recently used topics:\n" + "\n".join(f"- {topic}" for topic in recent) + "\n"
         
         prompt = """You are an HR Admin conducting a Group Discussion for campus placements.
 
 Generate a relevant and challenging GD topic suitable for engineering students. 
 The topic should be current, debatable, and test their analytical and communication skills.
-
+""" + avoid + """
 Then write a professional opening announcement (2-3 sentences) that:
 1. Introduces the topic
 2. Sets expectations for corporate behavior
@@ -32,50 +124,75 @@ Return response in JSON format:
     "message": "your opening announcement"
 }"""
         
-        response = self._call_api(prompt)
-        
-        try:
-            result = json.loads(response)
+        for attempt in range(retries + 1):
+            if on_delta is None:
+                response = await self._call_api(prompt)
+            else:
+                response = await self._call_api(prompt, on_delta=self._announcement_forwarder(on_delta))
+            
+            try:
+                result = json.loads(response)
+                topic = result["topic"]
+                result["message"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            
+            if topic in self.recent_topics and attempt < retries:
+                continue
+            self.recent_topics.add(topic)
             return result
-        except:
-            # Fallback
-            return {
-                "topic": "Should AI replace human jobs in the next decade?",
-                "message": "Good morning everyone. Today's topic is: Should AI replace human jobs in the next decade? This is a corporate-style group discussion. Please maintain professionalism, listen to others, and present your viewpoints clearly. You may begin."
-            }
+        
+        # Fallback
+        LLM_FALLBACKS.inc(agent="admin", reason="unusable")
+        return {
+            "topic": "Should AI replace human jobs in the next decade?",
+            "message": "Good morning everyone. Today's topic is: Should AI replace human jobs in the next decade? This is a corporate-style group discussion. Please maintain professionalism, listen to others, and present your viewpoints clearly. You may begin."
+        }
+    
+    def announce_given_topic(self, topic: str) -> Dict[str, str]:
+        """Opening announcement for a topic chosen by the organiser, without an LLM call"""
+        self.recent_topics.add(topic)
+        sentence = topic if topic.endswith((".", "?", "!")) else topic + "."
+        return {
+            "topic": topic,
+            "message": f"Good morning everyone. Today's topic is: {sentence} This is a corporate-style group discussion. Please maintain professionalism, listen to others, and present your viewpoints clearly. You may begin."
+        }
     
     async def close_discussion(self) -> str:
         """Generate closing message"""
         return "Thank you everyone for your participation. The discussion is now concluded. Please wait while we prepare your evaluation reports."
     
-    def _call_api(self, prompt: str, system: str = None) -> str:
+    def _announcement_forwarder(self, on_delta: Callable[[str], None]) -> Callable[[str], None]:
+        """Turn raw JSON fragments into fragments of the announcement message"""
+        buffer = []
+        forwarded = 0
+        
+        def on_chunk(chunk: str):
+            nonlocal forwarded
+            buffer.append(chunk)
+            text = partial_json_string("".join(buffer), "message")
+            if len(text) > forwarded:
+                on_delta(text[forwarded:])
+                forwarded = len(text)
+        
+        return on_chunk
+    
+    async def _call_api(self, prompt: str, system: str = None, on_delta: Optional[Callable[[str], None]] = None) -> str:
         """Call OpenRouter API"""
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
+        started = time.perf_counter()
+        content = await get_llm_policy().complete(
+            "topic",
+            prompt,
+            system=system,
+            on_delta=on_delta,
+            model=MODEL,
+            temperature=0.8
+        )
+        record_llm_call("admin", started, content)
         
-        try:
-            response = requests.post(
-                API_URL,
-                headers={
-                    "Authorization": f"Bearer {API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": MODEL,
-                    "messages": messages,
-                    "temperature": 0.8
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
-            else:
-                return "I understand the topic. Let me share my perspective."
-        except Exception as e:
+        if content is None:
             return "I understand the topic. Let me share my perspective."
+        return content
 
 
 class CandidateAgent:
@@ -96,8 +213,14 @@ class CandidateAgent:
         ]
         return random.choice(personalities)
     
-    async def generate_response(self, topic: str, discussion_context: List[Dict], human_input: str) -> str:
-        """Generate contextual response to discussion"""
+    async def generate_response(
+        self,
+        topic: str,
+        discussion_context: List[Dict],
+        human_input: str,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Generate contextual response to discussion, streaming it to on_delta if given"""
         
         # Build context from recent messages
         context_str = "\n".join([
@@ -125,77 +248,100 @@ Generate a response (2-4 sentences) that:
 
 Keep it natural and conversational. DO NOT be overly formal."""
         
-        response = self._call_api(prompt)
+        response = await self._call_api(prompt, topic, on_delta)
         return response
     
-    def _call_api(self, prompt: str) -> str:
+    async def _call_api(self, prompt: str, topic: str, on_delta: Optional[Callable[[str], None]] = None) -> str:
         """Call OpenRouter API"""
-        try:
-            response = requests.post(
-                API_URL,
-                headers={
-                    "Authorization": f"Bearer {API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": MODEL,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.9,
-                    "max_tokens": 150
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                content = response.json()["choices"][0]["message"]["content"]
-                # Clean up response
-                return content.strip()
-            else:
-                return f"That's an interesting point. I believe we should consider multiple perspectives on {topic}."
-        except Exception as e:
-            return "I'd like to add that this topic requires careful consideration of all stakeholders involved."
+        started = time.perf_counter()
+        content = await get_llm_policy().complete(
+            "reply",
+            prompt,
+            on_delta=on_delta,
+            model=MODEL,
+            temperature=0.9,
+            max_tokens=150
+        )
+        record_llm_call("candidate", started, content)
+        
+        if content is None:
+            LLM_FALLBACKS.inc(agent="candidate", reason="error")
+            return f"That's an interesting point. I believe we should consider multiple perspectives on {topic}."
+        # Clean up response
+        return content.strip()
+
+
+# Evaluation fan-out defaults: LLM evaluations in flight per session, and seconds
+# before unfinished participants get partial results
+EVALUATION_CONCURRENCY = int(os.environ.get("GD_EVALUATION_CONCURRENCY", 4))
+EVALUATION_DEADLINE = float(os.environ.get("GD_EVALUATION_DEADLINE", 90))
+# What _call_api returns when no model answered in time
+EMPTY_EVALUATION = "{}"
 
 
 class AnalysisAgent:
     """Silent evaluation agent"""
     
+    def __init__(
+        self,
+        max_concurrency: int = EVALUATION_CONCURRENCY,
+        deadline: float = EVALUATION_DEADLINE,
+        batched: bool = False
+    ):
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self.batched = batched
+        
+        # Instant statistics-based scores; also what failed LLM evaluations fall back to
+        self.heuristics = HeuristicScorer()
+        self.provisional: Dict[str, Dict] = {}
+    
     async def evaluate_all_participants(
         self, 
         participants: List[Dict],
-        participation_data: Dict,
-        messages: List[Dict],
+        participation_data: Dict[str, ParticipantStats],
+        digests: TranscriptSummarizer,
         topic: str
     ) -> Dict:
         """Generate comprehensive evaluation for all participants"""
+        self.score_provisional(participation_data, digests.transcript, topic)
         
-        evaluations = []
+        # Skip Admin
+        names = [participant["name"] for participant in participants if participant["name"] != "Admin"]
+        evaluations = await self.evaluate_participants(names, participation_data, digests, topic)
         
-        for participant in participants:
-            name = participant["name"]
-            data = participation_data.get(name, {})
-            
-            # Skip Admin
-            if name == "Admin":
-                continue
-            
-            # Calculate metrics
-            speaking_count = data.get("speaking_count", 0)
-            word_count = data.get("word_count", 0)
-            entry_time = data.get("entry_time", 999)
-            messages_list = data.get("messages", [])
-            
-            # Generate detailed evaluation using AI
-            eval_result = await self._evaluate_participant(
-                name=name,
-                topic=topic,
-                speaking_count=speaking_count,
-                word_count=word_count,
-                entry_time=entry_time,
-                messages=messages_list
-            )
-            
-            evaluations.append(eval_result)
+        return self.rank_evaluations(evaluations)
+    
+    async def evaluate_participants(
+        self,
+        names: List[str],
+        participation_data: Dict[str, ParticipantStats],
+        digests: TranscriptSummarizer,
+        topic: str
+    ) -> List[Dict]:
+        """Evaluate the named participants within the deadline, in one batch or concurrently"""
+        metrics = {
+            name: self._participant_metrics(participation_data.get(name), digests.content(name))
+            for name in names
+        }
         
+        if self.batched:
+            return await self._evaluate_batch(topic, metrics)
+        return await self._evaluate_concurrently(topic, metrics)
+    
+    def score_provisional(self, participation_data: Dict[str, ParticipantStats], transcript: Transcript, topic: str) -> Dict[str, Dict]:
+        """Heuristic evaluations for every participant, computed locally in milliseconds"""
+        results = self.heuristics.score_all(list(participation_data), participation_data, transcript, topic)
+        for name, result in results.items():
+            if not participation_data[name].speaking_count:
+                results[name] = self.no_contribution_evaluation(name)
+            else:
+                result["placement_readiness"] = self._readiness_level(result["overall_score"])
+        self.provisional = results
+        return results
+    
+    def rank_evaluations(self, evaluations: List[Dict]) -> Dict:
+        """Order evaluations by overall score and build the final report"""
         # Sort by overall score for ranking
         evaluations.sort(key=lambda x: x["overall_score"], reverse=True)
         
@@ -208,6 +354,126 @@ class AnalysisAgent:
             "summary": self._generate_summary(evaluations)
         }
     
+    async def evaluate_participant(self, name: str, topic: str, data: ParticipantStats, content: str) -> Dict:
+        """Evaluate one participant from their stats and a bounded digest of what they said"""
+        return await self._evaluate_participant(name=name, topic=topic, **self._participant_metrics(data, content))
+    
+    def _participant_metrics(self, data: Optional[ParticipantStats], content: str) -> Dict:
+        """Calculate the metrics fed into the evaluation prompt"""
+        if data is None:
+            return {"speaking_count": 0, "word_count": 0, "entry_time": 999, "content": content}
+        return {
+            "speaking_count": data.speaking_count,
+            "word_count": data.word_count,
+            "entry_time": 999 if data.entry_time is None else data.entry_time,
+            "content": content
+        }
+    
+    async def _evaluate_concurrently(self, topic: str, metrics: Dict[str, Dict]) -> List[Dict]:
+        """Evaluate participants in parallel, at most max_concurrency at a time"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def evaluate(name: str) -> Dict:
+            async with semaphore:
+                return await self._evaluate_participant(name=name, topic=topic, **metrics[name])
+        
+        tasks = {name: asyncio.create_task(evaluate(name)) for name in metrics}
+        if not tasks:
+            return []
+        
+        done, pending = await asyncio.wait(tasks.values(), timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+        
+        # Participants still unscored at the deadline, or whose evaluation
+        # raised, get a marked partial result
+        evaluations = []
+        for name, task in tasks.items():
+            if task not in done:
+                evaluations.append(self.partial_evaluation(name))
+            elif task.cancelled() or task.exception() is not None:
+                LLM_FALLBACKS.inc(agent="evaluation", reason="error")
+                result = self._fallback_for(name)
+                result["partial"] = True
+                evaluations.append(result)
+            else:
+                evaluations.append(task.result())
+        return evaluations
+    
+    async def _evaluate_batch(self, topic: str, metrics: Dict[str, Dict]) -> List[Dict]:
+        """Score every participant with a single LLM call"""
+        if not metrics:
+            return []
+        
+        blocks = "\n\n".join(
+            f"""Participant: {name}
+Speaking frequency: {m['speaking_count']} times
+Total words: {m['word_count']}
+Entry time: {m['entry_time']:.1f} seconds
+Content: {m['content']}"""
+            for name, m in metrics.items()
+        )
+        
+        prompt = f"""You are an HR evaluator for campus placements conducting a strict GD evaluation.
+
+Topic: {topic}
+
+{blocks}
+
+Evaluate EVERY participant above on a scale of 1-10 for each:
+
+1. Communication: Clarity, articulation, confidence
+2. Content Relevance: How well they addressed the topic
+3. Leadership: Initiative, guiding discussion
+4. Confidence: Body language (inferred), conviction
+5. Team Behavior: Listening, building on others' points
+6. Corporate Readiness: Professional language, maturity
+
+Also provide for each participant:
+- 2-3 specific strengths
+- 2-3 areas for improvement
+- 1-2 sentences of HR remarks
+- 2-3 actionable suggestions for improvement
+
+Return ONLY valid JSON:
+{{
+    "evaluations": [
+        {{
+            "name": "participant name",
+            "communication": score,
+            "content_relevance": score,
+            "leadership": score,
+            "confidence": score,
+            "team_behavior": score,
+            "corporate_readiness": score,
+            "strengths": ["strength1", "strength2"],
+            "weaknesses": ["weakness1", "weakness2"],
+            "hr_remarks": "remarks here",
+            "suggestions": ["suggestion1", "suggestion2"]
+        }}
+    ]
+}}"""
+        
+        response = await self._call_api(prompt, max_tokens=600 * len(metrics), deadline=self.deadline)
+        if response == EMPTY_EVALUATION:
+            # Nothing came back within the deadline: every result is partial, as in concurrent mode
+            return [self.partial_evaluation(name) for name in metrics]
+        
+        try:
+            results = {item["name"]: item for item in json.loads(response)["evaluations"]}
+        except (ValueError, KeyError, TypeError):
+            results = {}
+        
+        evaluations = []
+        for name in metrics:
+            result = self._score_result(name, results[name]) if name in results else None
+            if result is None:
+                LLM_FALLBACKS.inc(agent="evaluation", reason="unusable")
+                result = self._fallback_for(name)
+                result["partial"] = True
+            evaluations.append(result)
+        return evaluations
+    
     async def _evaluate_participant(
         self,
         name: str,
@@ -215,13 +481,10 @@ class AnalysisAgent:
         speaking_count: int,
         word_count: int,
         entry_time: float,
-        messages: List[str]
+        content: str
     ) -> Dict:
         """Evaluate individual participant"""
         
-        # Concatenate messages for content analysis
-        content = " ".join(messages) if messages else "No contribution"
-        
         prompt = f"""You are an HR evaluator for campus placements conducting a strict GD evaluation.
 
 Participant: {name}
@@ -260,20 +523,24 @@ Return ONLY valid JSON:
     "suggestions": ["suggestion1", "suggestion2"]
 }}"""
         
-        response = self._call_api(prompt)
+        response = await self._call_api(prompt)
         
         try:
             result = json.loads(response)
-            
+        except ValueError:
+            result = None
+        
+        scored = self._score_result(name, result)
+        if scored is None:
+            LLM_FALLBACKS.inc(agent="evaluation", reason="unusable")
+            return self._fallback_for(name)
+        return scored
+    
+    def _score_result(self, name: str, result: Dict) -> Optional[Dict]:
+        """Add overall score and readiness to a parsed LLM evaluation, None if it is malformed"""
+        try:
             # Calculate overall score
-            scores = [
-                result["communication"],
-                result["content_relevance"],
-                result["leadership"],
-                result["confidence"],
-                result["team_behavior"],
-                result["corporate_readiness"]
-            ]
+            scores = [result[key] for key in SCORE_KEYS]
             overall = sum(scores) / len(scores)
             
             result["overall_score"] = round(overall, 2)
@@ -281,23 +548,65 @@ Return ONLY valid JSON:
             result["placement_readiness"] = self._readiness_level(overall)
             
             return result
-        except:
-            # Fallback evaluation
-            return {
-                "name": name,
-                "communication": 6,
-                "content_relevance": 6,
-                "leadership": 5,
-                "confidence": 6,
-                "team_behavior": 7,
-                "corporate_readiness": 6,
-                "overall_score": 6.0,
-                "strengths": ["Participated in discussion", "Professional demeanor"],
-                "weaknesses": ["Could improve content depth", "Need more initiative"],
-                "hr_remarks": "Satisfactory performance with room for growth.",
-                "suggestions": ["Practice speaking with more examples", "Take more initiative"],
-                "placement_readiness": "Moderate"
-            }
+        except (KeyError, TypeError):
+            return None
+    
+    def partial_evaluation(self, name: str) -> Dict:
+        """Placeholder for a participant whose evaluation missed the deadline"""
+        LLM_FALLBACKS.inc(agent="evaluation", reason="deadline")
+        result = self._fallback_for(name)
+        result["partial"] = True
+        result["hr_remarks"] = "Evaluation did not complete in time; scores are provisional."
+        return result
+    
+    def pending_evaluation(self, name: str) -> Dict:
+        """Heuristic stand-in for a participant whose evaluation is still being refreshed"""
+        result = self._fallback_for(name)
+        result["partial"] = True
+        result["hr_remarks"] = "Evaluation is still being updated; scores are provisional."
+        return result
+    
+    def no_contribution_evaluation(self, name: str) -> Dict:
+        """Evaluation for a participant who never spoke; needs no LLM call"""
+        return {
+            "name": name,
+            "communication": 1,
+            "content_relevance": 1,
+            "leadership": 1,
+            "confidence": 1,
+            "team_behavior": 1,
+            "corporate_readiness": 1,
+            "overall_score": 1.0,
+            "strengths": [],
+            "weaknesses": ["Did not contribute to the discussion"],
+            "hr_remarks": "No contribution was recorded during the discussion.",
+            "suggestions": ["Enter the discussion early with a clear opening point"],
+            "placement_readiness": self._readiness_level(1.0)
+        }
+    
+    def _fallback_for(self, name: str) -> Dict:
+        """Heuristic scores for name if available, otherwise the fixed default"""
+        if name in self.provisional:
+            return dict(self.provisional[name])
+        return self._fallback_evaluation(name)
+    
+    def _fallback_evaluation(self, name: str) -> Dict:
+        """Default evaluation used when the LLM output is unusable"""
+        return {
+            "name": name,
+            "communication": 6,
+            "content_relevance": 6,
+            "leadership": 5,
+            "confidence": 6,
+            "team_behavior": 7,
+            "corporate_readiness": 6,
+            "overall_score": 6.0,
+            "strengths": ["Participated in discussion", "Professional demeanor"],
+            "weaknesses": ["Could improve content depth", "Need more initiative"],
+            "hr_remarks": "Satisfactory performance with room for growth.",
+            "suggestions": ["Practice speaking with more examples", "Take more initiative"],
+            "placement_readiness": "Moderate"
+        }
     
     def _readiness_level(self, score: float) -> str:
         """Determine placement readiness"""
@@ -314,27 +623,19 @@ Return ONLY valid JSON:
         """Generate overall summary"""
         return f"Evaluation complete for {len(evaluations)} participants. Rankings have been determined based on comprehensive performance analysis."
     
-    def _call_api(self, prompt: str) -> str:
-        """Call OpenRouter API"""
-        try:
-            response = requests.post(
-                API_URL,
-                headers={
-                    "Authorization": f"Bearer {API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": MODEL,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.3,
-                    "max_tokens": 800
-                },
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                return response.json()["choices"][0]["message"]["content"]
-            else:
-                return "{}"
-        except Exception as e:
-            return "{}"
+    async def _call_api(self, prompt: str, max_tokens: int = 800, deadline: Optional[float] = None) -> str:
+        """Call OpenRouter API; deadline overrides the evaluation latency budget"""
+        started = time.perf_counter()
+        content = await get_llm_policy().complete(
+            "evaluation",
+            prompt,
+            model=MODEL,
+            budget=deadline,
+            temperature=0.3,
+            max_tokens=max_tokens
+        )
+        record_llm_call("evaluation", started, content)
+        
+        if content is None:
+            return EMPTY_EVALUATION
+        return content
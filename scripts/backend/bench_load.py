@@ -0,0 +1,219 @@
+"""Load benchmark: N concurrent simulated sessions against the backend.
+
+Usage:
+    python bench_load.py [--sessions 50] [--messages 5] [--latency lognormal:0.8,0.5]
+                         [--error-rate 0.0] [--llm-url URL] [--batch-window MS]
+                         [--llm-concurrency N] [--llm-rate RPS] [--pacing] [--json]
+
+Each simulated user runs create -> start -> (send message, wait for an AI
+reply) x M -> end. Requests go through main.app in-process; the LLM is the
+in-process mock_llm_server unless --llm-url points at a running one.
+
+Reports throughput, p50/p95/p99 latency per endpoint, event-loop lag and
+memory growth.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+import httpx
+import gd_engine
+import main
+from llm_batcher import LLMBatcher, set_llm_batcher
+from llm_client import LLMClient, set_llm_client
+from llm_scheduler import LLMScheduler, LLM_MAX_CONCURRENCY, LLM_RATE_LIMIT, set_llm_scheduler
+from mock_llm_server import MockLLMConfig, create_app
+from session_archive import SessionArchive
+
+# How often the lag monitor wakes up, and how often users poll for replies
+LAG_INTERVAL = 0.05
+POLL_INTERVAL = 0.1
+REPLY_TIMEOUT = 60.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is absent"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoadRecorder:
+    """Latency samples per endpoint plus failure counts"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+
+async def monitor_loop_lag(samples: List[float]):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def wait_for_reply(client: httpx.AsyncClient, recorder: LoadRecorder, session_id: str, cursor: int) -> int:
+    """Poll status until someone other than the user speaks; returns the new cursor"""
+    deadline = time.perf_counter() + REPLY_TIMEOUT
+    started = time.perf_counter()
+
+    while time.perf_counter() < deadline:
+        response = await recorder.request(
+            client, "status", "GET", f"/api/session/{session_id}/status", params={"since": cursor}
+        )
+        data = response.json()
+        cursor = data["cursor"]
+        if any(m["participant"] != "YOU" for m in data["messages"]):
+            recorder.latencies["reply (end to end)"].append(time.perf_counter() - started)
+            return cursor
+        await asyncio.sleep(POLL_INTERVAL)
+
+    recorder.errors["reply (end to end)"] += 1
+    return cursor
+
+
+async def simulate_user(client: httpx.AsyncClient, recorder: LoadRecorder, messages: int):
+    response = await recorder.request(client, "create", "POST", "/api/session/create", json={})
+    session_id = response.json()["session_id"]
+
+    await recorder.request(client, "start", "POST", "/api/session/start", params={"session_id": session_id})
+    cursor = 0
+
+    for idx in range(messages):
+        await recorder.request(client, "send", "POST", "/api/message/send", json={
+            "session_id": session_id,
+            "participant": "YOU",
+            "message": f"Point {idx + 1}: I think we should weigh the long-term effects carefully.",
+            "timestamp": datetime.now().isoformat()
+        })
+        cursor = await wait_for_reply(client, recorder, session_id, cursor)
+
+    await recorder.request(client, "end", "POST", "/api/session/end", params={"session_id": session_id})
+    await recorder.request(client, "delete", "DELETE", f"/api/session/{session_id}")
+
+
+async def run(args) -> Dict:
+    if not args.pacing:
+        gd_engine.REPLY_PACING = (0.0, 0.0)
+
+    llm_transport = None
+    if args.llm_url is None:
+        config = MockLLMConfig(latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+        llm_transport = httpx.ASGITransport(app=create_app(config))
+
+    recorder = LoadRecorder()
+    lag_samples: List[float] = []
+    # Deleted sessions are archived; keep them out of the working directory
+    archive_dir = tempfile.TemporaryDirectory()
+    main.session_archive = SessionArchive(archive_dir.name)
+
+    async with main.lifespan(main.app):
+        # Installed after startup so the lifespan's own client handling is not bypassed
+        set_llm_client(LLMClient(
+            api_url=args.llm_url or "http://mock-llm/v1/chat/completions",
+            transport=llm_transport
+        ))
+        set_llm_batcher(LLMBatcher(window_ms=args.batch_window))
+        set_llm_scheduler(LLMScheduler(max_concurrency=args.llm_concurrency, rate=args.llm_rate))
+        monitor = asyncio.create_task(monitor_loop_lag(lag_samples))
+        rss_before = rss_mb()
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                simulate_user(client, recorder, args.messages) for _ in range(args.sessions)
+            ))
+            elapsed = time.perf_counter() - started
+
+        rss_after = rss_mb()
+        monitor.cancel()
+    archive_dir.cleanup()
+
+    total_requests = sum(len(v) for k, v in recorder.latencies.items() if k != "reply (end to end)")
+    return {
+        "sessions": args.sessions,
+        "messages_per_session": args.messages,
+        "elapsed_s": elapsed,
+        "sessions_per_s": args.sessions / elapsed,
+        "requests_per_s": total_requests / elapsed,
+        "endpoints": {
+            endpoint: {
+                "count": len(values),
+                "errors": recorder.errors[endpoint],
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000
+            }
+            for endpoint, values in recorder.latencies.items()
+        },
+        "loop_lag_ms": {
+            "p50": percentile(lag_samples, 50) * 1000,
+            "p99": percentile(lag_samples, 99) * 1000,
+            "max": max(lag_samples, default=0.0) * 1000
+        },
+        "rss_mb": {"before": rss_before, "after": rss_after, "growth": rss_after - rss_before}
+    }
+
+
+def print_report(report: Dict):
+    print(f"{report['sessions']} sessions x {report['messages_per_session']} messages in {report['elapsed_s']:.1f}s")
+    print(f"throughput: {report['sessions_per_s']:.2f} sessions/s, {report['requests_per_s']:.1f} requests/s")
+    print()
+    print(f"{'endpoint':<20} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, stats in report["endpoints"].items():
+        print(
+            f"{endpoint:<20} {stats['count']:>7} {stats['errors']:>7} "
+            f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+        )
+    print()
+    lag = report["loop_lag_ms"]
+    print(f"event-loop lag: p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms, max {lag['max']:.1f} ms")
+    rss = report["rss_mb"]
+    print(f"memory (RSS): {rss['before']:.1f} MB -> {rss['after']:.1f} MB ({rss['growth']:+.1f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--latency", default="lognormal:0.8,0.5", help="mock LLM latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock LLM error rate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-url", help="use a running LLM endpoint instead of the in-process mock")
+    parser.add_argument("--batch-window", type=float, default=0, help="LLM micro-batching window in ms (0 disables)")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_MAX_CONCURRENCY, help="LLM calls in flight at once")
+    parser.add_argument("--llm-rate", type=float, default=LLM_RATE_LIMIT, help="LLM requests/second (0 disables the limit)")
+    parser.add_argument("--pacing", action="store_true", help="keep the 1-3s pause between AI speakers")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
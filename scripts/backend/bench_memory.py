@@ -0,0 +1,83 @@
+"""Memory benchmark: bytes held per session for transcripts of various lengths.
+
+Usage:
+    python bench_memory.py [message counts...]
+
+Compares GDEngine's transcript/participation storage with the previous
+layout (a dict and ISO timestamp string per message plus a per-participant
+list of message texts).
+"""
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+from gd_engine import GDEngine
+
+WORDS = (
+    "AI automation jobs economy skills policy growth risk innovation workers "
+    "industry future education ethics data productivity balance regulation "
+    "opportunity transition training government startups impact society"
+).split()
+
+SPEAKERS = ["YOU", "Candidate 1", "Candidate 2", "Candidate 3", "Candidate 4"]
+
+
+def make_text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 50)))
+
+
+def build_engine(count: int, rng: random.Random) -> GDEngine:
+    engine = GDEngine("bench", rolling_evaluation=False)
+    engine.add_participant("YOU", is_human=True)
+    for _ in range(4):
+        engine.add_ai_candidate()
+    for _ in range(count):
+        speaker = rng.choice(SPEAKERS)
+        text = make_text(rng)
+        engine.add_message(speaker, text)
+        engine.track_participation(speaker, text)
+    return engine
+
+
+def build_legacy(count: int, rng: random.Random) -> dict:
+    messages = []
+    participation_data = {
+        name: {"messages": [], "entry_time": None, "speaking_count": 0, "word_count": 0}
+        for name in SPEAKERS
+    }
+    for _ in range(count):
+        speaker = rng.choice(SPEAKERS)
+        text = make_text(rng)
+        messages.append({
+            "participant": speaker,
+            "message": text,
+            "timestamp": datetime.now().isoformat()
+        })
+        data = participation_data[speaker]
+        data["messages"].append(text)
+        data["speaking_count"] += 1
+        data["word_count"] += len(text.split())
+    return {"messages": messages, "participation_data": participation_data}
+
+
+def measure(build, count: int) -> int:
+    rng = random.Random(count)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    session = build(count, rng)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del session
+    return after - before
+
+
+def main(counts):
+    print(f"{'messages':>10} {'compact bytes':>15} {'legacy bytes':>15} {'saving':>8}")
+    for count in counts:
+        compact = measure(build_engine, count)
+        legacy = measure(build_legacy, count)
+        print(f"{count:>10} {compact:>15,} {legacy:>15,} {1 - compact / legacy:>7.0%}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+# Event types pushed to session subscribers
+SNAPSHOT = "snapshot"
+MESSAGE_APPENDED = "message_appended"
+MESSAGE_DELTA = "message_delta"
+PARTICIPANT_JOINED = "participant_joined"
+STATUS_CHANGED = "status_changed"
+EVALUATION_READY = "evaluation_ready"
+TIME_WARNING = "time_warning"
+
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Queue markers: resync asks the consumer to send a fresh snapshot, closed ends the stream
+RESYNC = {"type": "resync"}
+CLOSED = {"type": "closed"}
+
+
+class SessionEventBus:
+    """Fan-out of session events to every connected subscriber"""
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        # seq of the last published event; snapshots record it as their version
+        self.version = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber; events published afterwards are queued for it"""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event_type: str, data: Optional[Dict] = None):
+        """Queue an event for all subscribers without blocking the publisher"""
+        self.version += 1
+        event = {"type": event_type, "seq": self.version, "data": data or {}}
+
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and let it resync from a snapshot
+                self._reset(queue, RESYNC)
+
+    def resync(self):
+        """Ask every subscriber to reload a full snapshot"""
+        for queue in list(self._subscribers):
+            self._reset(queue, RESYNC)
+
+    def close(self):
+        """End every subscriber's stream"""
+        for queue in list(self._subscribers):
+            self._reset(queue, CLOSED)
+        self._subscribers.clear()
+
+    def _reset(self, queue: asyncio.Queue, marker: Dict):
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(marker)
@@ -1,28 +1,198 @@
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Callable, List, Dict, Optional, Tuple
+import os
 import random
-from ai_agents import AdminAgent, CandidateAgent, AnalysisAgent
+import time
+from ai_agents import AdminAgent, CandidateAgent, AnalysisAgent, EVALUATION_DEADLINE
+from rolling_evaluator import RollingEvaluator
+from summarizer import TranscriptSummarizer
+from turn_scheduler import TurnScheduler
+from reply_mailbox import ReplyMailbox
+from speculation import SpeculativeResponder
+from transcript import Transcript, ParticipantStats, Message
+from metrics import ENGINE_STEP_SECONDS, REPLY_PACING_SECONDS, SESSION_TIMERS_FIRED, span
+from events import SessionEventBus, MESSAGE_APPENDED, MESSAGE_DELTA, PARTICIPANT_JOINED, STATUS_CHANGED, EVALUATION_READY, TIME_WARNING
+from timer_wheel import TimerHandle, get_timer_wheel
+
+# Seconds between consecutive AI speakers (uniform range)
+REPLY_PACING = (1.0, 3.0)
+# Participants seated before the discussion, humans first and AI candidates after
+GROUP_SIZE = 5
+
+# Session timeline in seconds from the start: extra candidates join, Admin warns, discussion ends
+CANDIDATE_INJECTION_AT = 5 * 60
+# 0 (the default) leaves ending the discussion to the client
+SESSION_TIME_LIMIT = float(os.environ.get("GD_SESSION_TIME_LIMIT", 0))
+TIME_WARNING_BEFORE = 2 * 60
+# AI candidates added at the injection point, by number of humans seated
+CANDIDATES_TO_INJECT = {1: 2, 2: 1}
+# Longest a session being dropped waits for its evaluation to be committed
+EVALUATION_SETTLE_TIMEOUT = EVALUATION_DEADLINE + 10
 
 class GDEngine:
     """Core GD simulation engine"""
     
-    def __init__(self, session_id: str):
+    def __init__(
+        self,
+        session_id: str,
+        streaming: bool = False,
+        batched_evaluation: bool = False,
+        rolling_evaluation: bool = False,
+        speculative: bool = False,
+        autonomous: bool = False
+    ):
         self.session_id = session_id
+        self.streaming = streaming
+        self.batched_evaluation = batched_evaluation
         self.status = "initialized"
         self.topic = None
         self.start_time = None
         self.participants = []
-        self.messages = []
+        self.messages = Transcript()
         self.participant_count = 0
+        self.human_count = 0
+        self.ai_count = 0
+        
+        # Epoch seconds for timestamps and elapsed time; simulations substitute virtual time
+        self.clock: Callable[[], float] = time.time
+        
+        # Bumped on every state change; used for status ETags
+        self.version = 0
         
         # Initialize AI agents
         self.admin_agent = AdminAgent()
-        self.analysis_agent = AnalysisAgent()
+        self.analysis_agent = AnalysisAgent(batched=batched_evaluation)
         self.candidate_agents = []
         
-        # Tracking data
-        self.participation_data = {}
+        # Tracking data: participant name -> ParticipantStats
+        self.participation_data: Dict[str, ParticipantStats] = {}
+        
+        # Bounded per-participant digests that evaluation prompts are built from
+        self.summarizer = TranscriptSummarizer(self.messages)
+        
+        # Background scoring while the discussion runs; None scores everything at the end
+        self.rolling_evaluator = None
+        if rolling_evaluation:
+            self.rolling_evaluator = RollingEvaluator(self.analysis_agent, self.participation_data, self.summarizer)
+        
+        # In-flight background reply tasks
+        self._reply_tasks = set()
+        
+        # Orders and coalesces human messages awaiting AI replies
+        self.mailbox = ReplyMailbox(self)
+        
+        # Deadlines on the process-wide timer wheel, armed when the discussion starts
+        self.time_limit: Optional[float] = SESSION_TIME_LIMIT or None
+        self.injection_at: Optional[float] = CANDIDATE_INJECTION_AT
+        self.candidates_injected = False
+        self._timers: List[TimerHandle] = []
+        self._timer_tasks = set()
+        
+        # Evaluation started by end_discussion, shared by concurrent callers
+        self._ending: Optional[asyncio.Task] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        
+        # Optional replies pre-generated while a human is typing
+        self.speculation = SpeculativeResponder(self) if speculative else None
+        
+        # With autonomous turn-taking, AI candidates also speak unprompted once started
+        self.autonomous = autonomous
+        self.turn_scheduler: Optional[TurnScheduler] = None
+        
+        # Live event stream for connected clients
+        self.events = SessionEventBus()
+        self.evaluation = None
+        self._stream_count = 0
+        
+        # Topic and opening generated ahead of time by the warm pool
+        self.prepared_announcement: Optional[Dict[str, str]] = None
+        
+        # Serializes state changes; a session store may swap in a cross-process lock
+        self._lock = asyncio.Lock()
+        self.transaction_factory = self._local_transaction
+        
+    @asynccontextmanager
+    async def _local_transaction(self) -> AsyncIterator["GDEngine"]:
+        async with self._lock:
+            yield self
+    
+    def transaction(self):
+        """Exclusive access to the session for a batch of state changes"""
+        return self.transaction_factory()
+    
+    def to_state(self) -> Dict:
+        """Serializable session state, excluding the transcript"""
+        state = {
+            "session_id": self.session_id,
+            "settings": {
+                "streaming": self.streaming,
+                "batched_evaluation": self.batched_evaluation,
+                "rolling_evaluation": self.rolling_evaluator is not None,
+                "speculative": self.speculation is not None,
+                "autonomous": self.autonomous
+            },
+            "status": self.status,
+            "topic": self.topic,
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "participants": self.participants,
+            "participant_count": self.participant_count,
+            "participation_data": {name: stats.to_dict() for name, stats in self.participation_data.items()},
+            "personalities": {agent.name: agent.personality for agent in self.candidate_agents},
+            "version": self.version,
+            "evaluation": self.evaluation,
+            "prepared_announcement": self.prepared_announcement,
+            "candidates_injected": self.candidates_injected
+        }
+        state["digests"] = self.summarizer.to_state()
+        if self.rolling_evaluator is not None:
+            state["rolling"] = self.rolling_evaluator.to_state()
+        return state
+    
+    @classmethod
+    def from_state(cls, state: Dict, messages: List[Tuple[str, str, float]]) -> "GDEngine":
+        """Rebuild an engine saved with to_state"""
+        engine = cls(state["session_id"], **state["settings"])
+        engine.load_state(state, messages)
+        return engine
+    
+    def load_state(self, state: Dict, new_messages: List[Tuple[str, str, float]]):
+        """Apply newer state saved elsewhere
+        
+        new_messages are (participant, text, time) for the transcript entries
+        after the ones already held.
+        """
+        self.status = state["status"]
+        self.topic = state["topic"]
+        self.start_time = datetime.fromisoformat(state["start_time"]) if state["start_time"] else None
+        self.participants = state["participants"]
+        self.participant_count = state["participant_count"]
+        self.human_count = sum(1 for p in self.participants if p["is_human"])
+        self.ai_count = self.participant_count - self.human_count
+        self.version = state["version"]
+        self.evaluation = state["evaluation"]
+        self.prepared_announcement = state.get("prepared_announcement")
+        self.candidates_injected = state.get("candidates_injected", False)
+        for participant, text, timestamp in new_messages:
+            self.messages.append(participant, text, timestamp)
+        
+        # Update in place: the rolling evaluator holds a reference
+        for name, data in state["participation_data"].items():
+            if name not in self.participation_data:
+                self.participation_data[name] = ParticipantStats(self.messages.speaker_id(name))
+            self.participation_data[name].load(data)
+        
+        known = {agent.name for agent in self.candidate_agents}
+        for name, personality in state["personalities"].items():
+            if name not in known:
+                agent = CandidateAgent(name)
+                agent.personality = personality
+                self.candidate_agents.append(agent)
+        
+        self.summarizer.load_state(state.get("digests", {}))
+        if self.rolling_evaluator is not None and "rolling" in state:
+            self.rolling_evaluator.load_state(state["rolling"])
         
     def add_participant(self, name: str, is_human: bool = False):
         """Add a participant to the GD"""
@@ -30,20 +200,21 @@ class GDEngine:
             "id": f"p{self.participant_count}",
             "name": name,
             "is_human": is_human,
-            "join_time": datetime.now().isoformat()
+            "join_time": datetime.fromtimestamp(self.clock()).isoformat()
         }
         self.participants.append(participant)
-        self.participation_data[name] = {
-            "messages": [],
-            "entry_time": None,
-            "speaking_count": 0,
-            "word_count": 0
-        }
+        self.participation_data[name] = ParticipantStats(self.messages.speaker_id(name))
         self.participant_count += 1
+        if is_human:
+            self.human_count += 1
+        else:
+            self.ai_count += 1
+        self.version += 1
+        self.events.publish(PARTICIPANT_JOINED, participant)
         
     def add_ai_candidate(self):
         """Add an AI candidate"""
-        candidate_num = len([p for p in self.participants if not p["is_human"]]) + 1
+        candidate_num = self.ai_count + 1
         candidate_name = f"Candidate {candidate_num}"
         
         # Create AI agent for this candidate
@@ -52,25 +223,114 @@ class GDEngine:
         
         self.add_participant(candidate_name, is_human=False)
         
+    def inject_candidates(self):
+        """Top the group up once mid-discussion: 2 candidates with one human, 1 with two, none otherwise"""
+        if self.candidates_injected:
+            return
+        self.candidates_injected = True
+        
+        for i in range(CANDIDATES_TO_INJECT.get(self.get_human_count(), 0)):
+            self.add_ai_candidate()
+    
+    def seat_default_participants(self):
+        """Seat the human "YOU" and the initial AI candidates"""
+        self.seat_participants(["YOU"])
+    
+    def seat_participants(self, humans: List[str], group_size: int = GROUP_SIZE):
+        """Seat the given humans, then fill the remaining seats with AI candidates"""
+        for name in humans:
+            self.add_participant(name, is_human=True)
+        
+        while len(self.participants) < group_size:
+            self.add_ai_candidate()
+    
+    async def prepare(self, topic_retries: int = 0):
+        """Generate the topic and opening announcement before the discussion starts"""
+        self.prepared_announcement = await self.admin_agent.announce_topic(retries=topic_retries)
+    
     def get_participants(self) -> List[Dict]:
         """Return participant list"""
         return self.participants
     
+    def is_human(self, name: str) -> bool:
+        return any(p["name"] == name and p["is_human"] for p in self.participants)
+    
     def get_human_count(self) -> int:
         """Count human participants"""
-        return len([p for p in self.participants if p["is_human"]])
+        return self.human_count
+    
+    def snapshot(self) -> Dict:
+        """Full session state, sent to clients before incremental events"""
+        return {
+            "session_id": self.session_id,
+            "status": self.status,
+            "topic": self.topic,
+            "elapsed_time": self.get_elapsed_time(),
+            "participants": self.participants,
+            "messages": self.messages.as_dicts(),
+            "cursor": self.message_seq,
+            "evaluation": self.evaluation,
+            "version": self.events.version
+        }
+    
+    @property
+    def message_seq(self) -> int:
+        """Last assigned message sequence number"""
+        return len(self.messages)
+    
+    def messages_since(self, since: int) -> List[Dict]:
+        """Messages with seq greater than since"""
+        return self.messages.as_dicts(since)
+    
+    def _publish_status(self):
+        self.version += 1
+        self.events.publish(STATUS_CHANGED, {
+            "status": self.status,
+            "topic": self.topic,
+            "start_time": self.start_time.isoformat() if self.start_time else None
+        })
     
     async def start_discussion(self) -> Dict:
-        """Start the GD - Admin announces topic"""
-        self.status = "in_progress"
-        self.start_time = datetime.now()
+        """Start the GD - Admin announces topic
         
-        # Admin generates topic and opening message
-        topic_announcement = await self.admin_agent.announce_topic()
-        self.topic = topic_announcement["topic"]
+        The announcement is generated outside the session transaction so
+        other requests to the session aren't held up by the LLM call.
+        """
+        async with self.transaction():
+            if self.status != "initialized":
+                # Started by another request already
+                return {
+                    "status": "started",
+                    "topic": self.topic,
+                    "admin_message": None,
+                    "start_time": self.start_time.isoformat() if self.start_time else None
+                }
+            self.status = "in_progress"
+            self.start_time = datetime.fromtimestamp(self.clock())
+            self._publish_status()
+            topic_announcement = self.prepared_announcement
+            self.prepared_announcement = None
         
-        # Add admin message
-        self.add_message("Admin", topic_announcement["message"], datetime.now().isoformat())
+        # Admin generates topic and opening message, unless prepared in advance
+        stream_id, on_delta = None, None
+        if topic_announcement is None:
+            if self.streaming:
+                stream_id, on_delta = self._open_stream("Admin")
+            topic_announcement = await self.admin_agent.announce_topic(on_delta=on_delta)
+        
+        async with self.transaction():
+            self.topic = topic_announcement["topic"]
+            self._publish_status()
+            
+            # Add admin message
+            self.add_message("Admin", topic_announcement["message"], stream_id=stream_id)
+            
+            # The session may have been ended while the topic was generated
+            if self.status == "in_progress":
+                if self.autonomous:
+                    self.turn_scheduler = TurnScheduler(self)
+                    self.turn_scheduler.start()
+                self._arm_timers()
         
         return {
             "status": "started",
@@ -79,82 +339,310 @@ class GDEngine:
             "start_time": self.start_time.isoformat()
         }
     
-    def add_message(self, participant: str, message: str, timestamp: str):
-        """Add a message to transcript"""
-        msg = {
-            "participant": participant,
-            "message": message,
-            "timestamp": timestamp
-        }
-        self.messages.append(msg)
+    def add_message(
+        self,
+        participant: str,
+        message: str,
+        timestamp: Optional[float] = None,
+        stream_id: Optional[str] = None
+    ) -> Message:
+        """Add a message to transcript
+        
+        timestamp is epoch seconds (defaults to now). stream_id ties the
+        committed message to the deltas streamed before it.
+        """
+        record = self.messages.append(participant, message, self.clock() if timestamp is None else timestamp)
+        self.version += 1
+        
+        msg = self.messages.as_dict(record)
+        if stream_id:
+            msg["stream_id"] = stream_id
+        self.events.publish(MESSAGE_APPENDED, msg)
+        return record
+    
+    def _open_stream(self, participant: str) -> Tuple[str, Callable[[str], None]]:
+        """Allocate a stream id and a callback publishing partial text for it"""
+        self._stream_count += 1
+        stream_id = f"s{self._stream_count}"
+        
+        def on_delta(text: str):
+            self.events.publish(MESSAGE_DELTA, {
+                "stream_id": stream_id,
+                "participant": participant,
+                "delta": text
+            })
+        
+        return stream_id, on_delta
         
     def track_participation(self, participant: str, message: str):
         """Track participation metrics for evaluation"""
         if participant in self.participation_data:
             data = self.participation_data[participant]
-            data["messages"].append(message)
-            data["speaking_count"] += 1
-            data["word_count"] += len(message.split())
+            data.speaking_count += 1
+            data.word_count += len(message.split())
             
             # Record first entry time
-            if data["entry_time"] is None:
-                data["entry_time"] = self.get_elapsed_time()
+            if data.entry_time is None:
+                data.entry_time = self.get_elapsed_time()
+            
+            if self.turn_scheduler is not None and self.is_human(participant):
+                self.turn_scheduler.on_human_activity()
+            
+            self.summarizer.notify(participant, self.topic)
+            if self.rolling_evaluator is not None:
+                self.rolling_evaluator.notify(participant, self.topic)
+    
+    def select_responders(self) -> List[CandidateAgent]:
+        """Randomly select 1-2 candidates to respond"""
+        num_responses = random.randint(1, min(2, len(self.candidate_agents)))
+        return random.sample(self.candidate_agents, num_responses)
     
     async def generate_ai_responses(self, human_message: str) -> List[Dict]:
-        """Generate responses from AI candidates"""
-        responses = []
+        """Generate responses from AI candidates concurrently"""
+        responding_agents = self.select_responders()
         
-        # Randomly select 1-2 candidates to respond
-        num_responses = random.randint(1, min(2, len(self.candidate_agents)))
-        responding_agents = random.sample(self.candidate_agents, num_responses)
-        
-        for agent in responding_agents:
-            # Generate contextual response
-            response = await agent.generate_response(
-                topic=self.topic,
-                discussion_context=self.messages[-5:],  # Last 5 messages
-                human_input=human_message
-            )
-            
-            timestamp = datetime.now().isoformat()
-            self.add_message(agent.name, response, timestamp)
-            self.track_participation(agent.name, response)
+        context = self.messages.recent(5)  # Last 5 messages
+        with ENGINE_STEP_SECONDS.time(step="generate_ai_responses"), span("engine.generate_ai_responses", session_id=self.session_id):
+            replies = await asyncio.gather(*[
+                agent.generate_response(
+                    topic=self.topic,
+                    discussion_context=context,
+                    human_input=human_message
+                )
+                for agent in responding_agents
+            ])
+        
+        return [
+            {"participant": agent.name, "message": reply}
+            for agent, reply in zip(responding_agents, replies)
+        ]
+    
+    async def deliver_ai_responses(self, responses: List[Dict]) -> List[Dict]:
+        """Commit generated replies to the transcript with realistic pacing"""
+        delivered = []
+        
+        for idx, response in enumerate(responses):
+            # Slight delay between speakers for realism
+            if idx > 0:
+                pause = random.uniform(*REPLY_PACING)
+                REPLY_PACING_SECONDS.inc(pause)
+                await asyncio.sleep(pause)
             
-            responses.append({
-                "participant": agent.name,
-                "message": response,
-                "timestamp": timestamp
-            })
+            async with self.transaction():
+                if self.status != "in_progress":
+                    break
+                
+                record = self.add_message(response["participant"], response["message"])
+                self.track_participation(response["participant"], response["message"])
+                delivered.append(self.messages.as_dict(record))
+        
+        return delivered
+    
+    async def _stream_ai_response(self, agent: CandidateAgent, context: List[Dict], human_message: str):
+        """Stream one candidate's reply to subscribers, then commit it"""
+        stream_id, on_delta = self._open_stream(agent.name)
+        response = await agent.generate_response(
+            topic=self.topic,
+            discussion_context=context,
+            human_input=human_message,
+            on_delta=on_delta
+        )
+        
+        async with self.transaction():
+            if self.status != "in_progress":
+                return
             
-            # Slight delay for realism
-            await asyncio.sleep(random.uniform(1, 3))
+            self.add_message(agent.name, response, stream_id=stream_id)
+            self.track_participation(agent.name, response)
+    
+    async def _respond_to_messages(self, batch: List[Tuple[int, str, str]]):
+        """One round of AI replies answering every (seq, participant, message) in batch"""
+        if len(batch) == 1:
+            human_message = batch[0][2]
+        else:
+            human_message = "\n".join(f"{participant}: {message}" for _, participant, message in batch)
         
-        return responses
+        # Speculated replies answer a single message, made right after the transcript they saw
+        if self.speculation is not None and len(batch) == 1:
+            responses = await self.speculation.claim(batch[0][0] - 1, human_message)
+            if responses is not None:
+                await self.deliver_ai_responses(responses)
+                return
+        
+        if self.streaming:
+            # Streamed text paces itself, so replies are committed as they finish
+            context = self.messages.recent(5)
+            await asyncio.gather(*[
+                self._stream_ai_response(agent, context, human_message)
+                for agent in self.select_responders()
+            ])
+            return
+        
+        responses = await self.generate_ai_responses(human_message)
+        await self.deliver_ai_responses(responses)
+    
+    def respond_to_message(self, record: Message) -> asyncio.Task:
+        """Queue AI replies to a committed human message so the caller can return immediately"""
+        return self.mailbox.post(record.seq, self.messages.speakers[record.speaker], record.text)
+    
+    def _arm_timers(self):
+        """Schedule this session's deadlines, measured from its start time"""
+        wheel = get_timer_wheel()
+        # Announcing the topic takes a moment after the clock starts
+        elapsed = self.get_elapsed_time()
+        events = []
+        if self.injection_at is not None:
+            events.append((self.injection_at, self._timed_injection))
+        if self.time_limit is not None:
+            events.append((self.time_limit - TIME_WARNING_BEFORE, self._timed_warning))
+            events.append((self.time_limit, self._timed_end))
+        self._timers = [
+            wheel.schedule(at - elapsed, lambda handler=handler: self._spawn_timer(handler))
+            for at, handler in events
+        ]
+    
+    def _disarm_timers(self):
+        for timer in self._timers:
+            timer.cancel()
+        self._timers = []
+    
+    def _spawn_timer(self, handler: Callable):
+        task = asyncio.create_task(handler())
+        self._timer_tasks.add(task)
+        task.add_done_callback(self._timer_tasks.discard)
+    
+    async def _timed_injection(self):
+        async with self.transaction():
+            if self.status == "in_progress" and not self.candidates_injected:
+                SESSION_TIMERS_FIRED.inc(event="inject_candidates")
+                self.inject_candidates()
+    
+    async def _timed_warning(self):
+        async with self.transaction():
+            if self.status != "in_progress":
+                return
+            SESSION_TIMERS_FIRED.inc(event="time_warning")
+            remaining = max(0.0, self.time_limit - self.get_elapsed_time())
+            self.add_message("Admin", f"About {round(remaining / 60)} minutes remain. Please start bringing your points to a conclusion.")
+            self.events.publish(TIME_WARNING, {"remaining": remaining})
+    
+    async def _timed_end(self):
+        if self.status != "in_progress":
+            return
+        SESSION_TIMERS_FIRED.inc(event="end")
+        await self.end_discussion()
     
     def get_elapsed_time(self) -> float:
         """Get elapsed time in seconds"""
         if self.start_time:
-            return (datetime.now() - self.start_time).total_seconds()
+            return self.clock() - self.start_time.timestamp()
         return 0
     
+    def close(self):
+        """Release background work and subscribers when the session is dropped"""
+        for task in list(self._reply_tasks):
+            task.cancel()
+        if self.turn_scheduler is not None:
+            self.turn_scheduler.stop()
+        self._disarm_timers()
+        for task in list(self._timer_tasks):
+            task.cancel()
+        if self._ending is not None:
+            self._ending.cancel()
+        if self._refreshing is not None:
+            self._refreshing.cancel()
+        self.summarizer.close()
+        if self.rolling_evaluator is not None:
+            self.rolling_evaluator.close()
+        if self.speculation is not None:
+            self.speculation.close()
+        self.events.close()
+    
+    @property
+    def evaluating(self) -> bool:
+        """Whether an evaluation started in this process is still to be committed"""
+        return any(task is not None and not task.done() for task in (self._ending, self._refreshing))
+    
+    async def wait_for_evaluation(self, timeout: float = EVALUATION_SETTLE_TIMEOUT):
+        """Wait up to timeout for in-flight evaluations, since close() cancels them"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        if self._ending is not None:
+            await asyncio.wait([self._ending], timeout=timeout)
+        # A rolling refresh only starts once the first evaluation is committed
+        if self._refreshing is not None:
+            await asyncio.wait([self._refreshing], timeout=max(0.0, deadline - loop.time()))
+    
+    def provisional_evaluation(self) -> Dict:
+        """Ranked heuristic scores for the discussion so far, without any LLM calls"""
+        results = self.analysis_agent.score_provisional(self.participation_data, self.messages, self.topic)
+        evaluations = [dict(result) for result in results.values()]
+        return self.analysis_agent.rank_evaluations(evaluations)
+    
     async def end_discussion(self) -> Dict:
-        """End discussion and generate evaluation"""
-        self.status = "completed"
+        """End discussion and generate evaluation
         
-        # Generate admin closing message
+        Only the status change and closing message happen inside the session
+        transaction; the evaluation runs outside it and is committed under it
+        once ready. Concurrent callers in this process share one evaluation.
+        """
         closing = await self.admin_agent.close_discussion()
-        self.add_message("Admin", closing, datetime.now().isoformat())
-        
-        # Generate comprehensive evaluation using Analysis Agent
-        evaluation = await self.analysis_agent.evaluate_all_participants(
-            participants=self.participants,
-            participation_data=self.participation_data,
-            messages=self.messages,
-            topic=self.topic
-        )
+        async with self.transaction():
+            if self.status != "completed":
+                self.status = "completed"
+                self._disarm_timers()
+                
+                # Drop replies that have not been delivered yet
+                for task in list(self._reply_tasks):
+                    task.cancel()
+                if self.turn_scheduler is not None:
+                    self.turn_scheduler.stop()
+                if self.speculation is not None:
+                    self.speculation.close()
+                self._publish_status()
+                
+                self.add_message("Admin", closing)
+                self._ending = asyncio.create_task(self._evaluate())
+        
+        # Already evaluated, or being evaluated by another worker when None is returned
+        if self._ending is not None:
+            # One caller giving up doesn't stop the evaluation for the others
+            await asyncio.shield(self._ending)
         
         return {
             "status": "completed",
             "admin_closing": closing,
-            "evaluation": evaluation
+            "evaluation": self.evaluation
         }
+    
+    async def _evaluate(self):
+        with ENGINE_STEP_SECONDS.time(step="end_discussion"), span("engine.end_discussion", session_id=self.session_id):
+            if self.rolling_evaluator is not None:
+                # Scores were kept current during the discussion; only rank them
+                # and re-evaluate latecomers in the background
+                evaluation = await self.rolling_evaluator.finalize(self.participants)
+            else:
+                # Generate comprehensive evaluation using Analysis Agent
+                evaluation = await self.analysis_agent.evaluate_all_participants(
+                    participants=self.participants,
+                    participation_data=self.participation_data,
+                    digests=self.summarizer,
+                    topic=self.topic
+                )
+        
+        await self._commit_evaluation(evaluation)
+        if self.rolling_evaluator is not None and self.rolling_evaluator.stale_speakers(self.participants):
+            self._refreshing = asyncio.create_task(self._refresh_evaluation())
+    
+    async def _refresh_evaluation(self):
+        """Replace provisional rolling scores once the stale participants are re-evaluated"""
+        with ENGINE_STEP_SECONDS.time(step="refresh_evaluation"), span("engine.refresh_evaluation", session_id=self.session_id):
+            evaluation = await self.rolling_evaluator.refresh(self.participants)
+        if evaluation is not None:
+            await self._commit_evaluation(evaluation)
+    
+    async def _commit_evaluation(self, evaluation: Dict):
+        async with self.transaction():
+            self.evaluation = evaluation
+            self.version += 1
+            self.events.publish(EVALUATION_READY, evaluation)
@@ -0,0 +1,201 @@
+import re
+from typing import Dict, List, Optional
+import numpy as np
+from transcript import Transcript, ParticipantStats
+
+SCORE_KEYS = [
+    "communication",
+    "content_relevance",
+    "leadership",
+    "confidence",
+    "team_behavior",
+    "corporate_readiness"
+]
+
+# Per-participant features, each scaled to 0..1
+FEATURES = ["presence", "verbosity", "relevance", "early_entry", "engagement", "restraint"]
+
+# How each score (row) blends the features (columns); rows sum to 1
+SCORE_WEIGHTS = np.array([
+    # presence verbosity relevance early engagement restraint
+    [0.40, 0.60, 0.00, 0.00, 0.00, 0.00],  # communication
+    [0.00, 0.20, 0.80, 0.00, 0.00, 0.00],  # content_relevance
+    [0.50, 0.00, 0.00, 0.50, 0.00, 0.00],  # leadership
+    [0.50, 0.30, 0.00, 0.20, 0.00, 0.00],  # confidence
+    [0.00, 0.00, 0.00, 0.00, 0.60, 0.40],  # team_behavior
+    [0.15, 0.25, 0.35, 0.00, 0.05, 0.20]   # corporate_readiness
+])
+
+FEATURE_NOTES = {
+    "presence": ("Contributed a fair share of the discussion", "Spoke too rarely to shape the discussion", "Aim to contribute every few minutes"),
+    "verbosity": ("Points were well developed without rambling", "Turns were either too brief or too long", "Make each point in 2-4 clear sentences"),
+    "relevance": ("Stayed close to the topic", "Drifted away from the topic", "Tie every point back to the topic"),
+    "early_entry": ("Entered the discussion early", "Entered the discussion late", "Open with a clear stance in the first minutes"),
+    "engagement": ("Built on other participants' points", "Rarely engaged with what others said", "Reference and build on others' arguments"),
+    "restraint": ("Let others finish before speaking", "Frequently cut in right after others", "Pause before responding to let others finish")
+}
+
+# Words per turn that reads as a well-developed point, and the spread around it
+IDEAL_WORDS_PER_TURN = 40.0
+WORDS_PER_TURN_SPREAD = 30.0
+# Entry after this many seconds earns no early-entry credit
+EARLY_ENTRY_WINDOW = 120.0
+# A turn starting this soon after someone else's counts as cutting in
+INTERRUPTION_GAP = 1.0
+
+TOKEN = re.compile(r"[a-z][a-z']+")
+STOPWORDS = frozenset(
+    "the a an and or of to in on for with is are be should would could will can it this that "
+    "by as at from over than into its their our your we you they he she not do does did has have "
+    "had was were been more most less next any all what which who why how".split()
+)
+# Speaker names that aren't candidates to address, or read as ordinary words ("you")
+UNADDRESSABLE_NAMES = frozenset({"admin", "you"})
+ENGAGEMENT_MARKERS = re.compile(
+    r"\b(agree|disagree|building on|build on|adding to|as (?:\w+ )?(?:said|mentioned|pointed out)|"
+    r"your point|that point|good point|you said|you mentioned)\b",
+    re.IGNORECASE
+)
+
+
+def keywords(text: str) -> set:
+    return {word for word in TOKEN.findall(text.lower()) if word not in STOPWORDS}
+
+
+class HeuristicScorer:
+    """Scores participants from transcript statistics in a single vectorized pass
+
+    Per-message features are cached, so repeated calls only process messages
+    added since the last one.
+    """
+
+    def __init__(self):
+        self._reset(None)
+
+    def _reset(self, topic: Optional[str]):
+        self._topic = topic
+        self._topic_words = keywords(topic or "")
+        self._speakers: List[int] = []
+        self._words: List[int] = []
+        self._overlap: List[float] = []
+        self._engaged: List[bool] = []
+        self._interruption: List[bool] = []
+        # Word-bounded pattern per speaker id; None for names that don't count as mentions
+        self._name_patterns: List[Optional[re.Pattern]] = []
+
+    def _mentions(self, speakers: List[str]) -> List[Optional[re.Pattern]]:
+        for name in speakers[len(self._name_patterns):]:
+            name = name.lower()
+            self._name_patterns.append(
+                None if name in UNADDRESSABLE_NAMES else re.compile(rf"\b{re.escape(name)}\b")
+            )
+        return self._name_patterns
+
+    def _extend(self, transcript: Transcript, topic: str):
+        if topic != self._topic:
+            self._reset(topic)
+
+        records = transcript.records
+        patterns = self._mentions(transcript.speakers)
+        for idx in range(len(self._speakers), len(records)):
+            message = records[idx]
+            text = message.text.lower()
+            self._speakers.append(message.speaker)
+            self._words.append(len(text.split()))
+
+            message_words = keywords(text)
+            self._overlap.append(
+                len(message_words & self._topic_words) / len(self._topic_words) if self._topic_words else 0.0
+            )
+
+            mentions_other = any(
+                pattern.search(text) for speaker, pattern in enumerate(patterns)
+                if pattern is not None and speaker != message.speaker
+            )
+            self._engaged.append(mentions_other or ENGAGEMENT_MARKERS.search(text) is not None)
+
+            previous = records[idx - 1] if idx else None
+            # Human messages carry client timestamps and AI ones server time, so a
+            # negative gap is clock skew rather than cutting in
+            self._interruption.append(
+                previous is not None
+                and previous.speaker != message.speaker
+                and 0 <= message.time - previous.time < INTERRUPTION_GAP
+            )
+
+    def features(
+        self,
+        names: List[str],
+        participation_data: Dict[str, ParticipantStats],
+        transcript: Transcript,
+        topic: str
+    ) -> np.ndarray:
+        """Feature matrix of shape (len(FEATURES), len(names))"""
+        self._extend(transcript, topic)
+
+        ids = np.array([transcript.speaker_id(name) for name in names])
+        size = max(len(transcript.speakers), 1)
+        speakers = np.array(self._speakers, dtype=np.int64)
+
+        def per_speaker(values) -> np.ndarray:
+            return np.bincount(speakers, weights=np.asarray(values, dtype=np.float64), minlength=size)[ids]
+
+        turns = np.bincount(speakers, minlength=size)[ids].astype(np.float64)
+        safe_turns = np.maximum(turns, 1)
+
+        total_turns = max(turns.sum(), 1)
+        expected_share = 1 / max(len(names), 1)
+        presence = np.clip(turns / total_turns / expected_share, 0, 1.5) / 1.5
+
+        words_per_turn = per_speaker(self._words) / safe_turns
+        verbosity = np.exp(-((words_per_turn - IDEAL_WORDS_PER_TURN) / WORDS_PER_TURN_SPREAD) ** 2)
+
+        relevance = np.clip(2 * per_speaker(self._overlap) / safe_turns, 0, 1)
+
+        entry = np.array([
+            EARLY_ENTRY_WINDOW if participation_data[name].entry_time is None else participation_data[name].entry_time
+            for name in names
+        ], dtype=np.float64)
+        early_entry = 1 - np.clip(entry / EARLY_ENTRY_WINDOW, 0, 1)
+
+        engagement = np.clip(2 * per_speaker(self._engaged) / safe_turns, 0, 1)
+        restraint = 1 - np.clip(per_speaker(self._interruption) / safe_turns, 0, 1)
+
+        matrix = np.vstack([presence, verbosity, relevance, early_entry, engagement, restraint])
+        # Participants who never spoke have no features
+        matrix[:, turns == 0] = 0
+        return matrix
+
+    def score_all(
+        self,
+        names: List[str],
+        participation_data: Dict[str, ParticipantStats],
+        transcript: Transcript,
+        topic: str
+    ) -> Dict[str, Dict]:
+        """Evaluation dicts in the AnalysisAgent format, one per name"""
+        if not names:
+            return {}
+
+        matrix = self.features(names, participation_data, transcript, topic)
+        scores = np.round(1 + 9 * (SCORE_WEIGHTS @ matrix), 1)
+        overall = np.round(scores.mean(axis=0), 2)
+
+        evaluations = {}
+        for col, name in enumerate(names):
+            order = np.argsort(matrix[:, col])
+            weakest = [FEATURES[idx] for idx in order[:2]]
+            strongest = [FEATURES[idx] for idx in order[::-1][:2]]
+
+            evaluation = {key: float(scores[row, col]) for row, key in enumerate(SCORE_KEYS)}
+            evaluation.update({
+                "name": name,
+                "overall_score": float(overall[col]),
+                "strengths": [FEATURE_NOTES[feature][0] for feature in strongest],
+                "weaknesses": [FEATURE_NOTES[feature][1] for feature in weakest],
+                "hr_remarks": "Scores estimated from participation statistics.",
+                "suggestions": [FEATURE_NOTES[feature][2] for feature in weakest],
+                "heuristic": True
+            })
+            evaluations[name] = evaluation
+        return evaluations
@@ -0,0 +1,212 @@
+import asyncio
+import os
+from typing import Dict, List, Optional, Tuple
+from llm_client import LLMClient, get_llm_client, record_usage, DEFAULT_DEADLINE
+from metrics import LLM_BATCHES, LLM_BATCH_SIZE
+
+# Collection window in milliseconds (0 sends every prompt on its own)
+BATCH_WINDOW_MS = float(os.environ.get("GD_LLM_BATCH_WINDOW_MS", 0))
+BATCH_MAX_SIZE = int(os.environ.get("GD_LLM_BATCH_MAX_SIZE", 32))
+# Completions endpoint that accepts a list of prompts; derived from the chat URL if unset
+BATCH_URL = os.environ.get("GD_LLM_BATCH_URL")
+
+# Status codes meaning the backend has no batched completions endpoint
+UNSUPPORTED_STATUSES = (400, 404, 405, 501)
+# Seconds to send prompts individually after a rejected batch before trying a batch again
+BATCH_REPROBE_INTERVAL = float(os.environ.get("GD_LLM_BATCH_REPROBE_INTERVAL", 300))
+
+
+class PendingPrompt:
+    __slots__ = ("prompt", "future", "deadline")
+
+    def __init__(self, prompt: str, future: asyncio.Future, deadline: float):
+        self.prompt = prompt
+        self.future = future
+        # Loop time by which the caller stops waiting
+        self.deadline = deadline
+
+
+class LLMBatcher:
+    """Aggregates non-streaming completions from all sessions into batched requests
+
+    Prompts sharing model, temperature and max_tokens are collected for up
+    to window_ms and sent as one legacy /v1/completions request with a list
+    of prompts; choices are matched back to callers by index. Anything the
+    batch cannot answer is retried as an individual chat call within the
+    caller's deadline. After a backend rejects a batch, prompts go out
+    individually for reprobe_interval seconds before batching is tried again.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = BATCH_WINDOW_MS,
+        max_size: int = BATCH_MAX_SIZE,
+        batch_url: Optional[str] = BATCH_URL,
+        client: Optional[LLMClient] = None,
+        reprobe_interval: float = BATCH_REPROBE_INTERVAL
+    ):
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.batch_url = batch_url
+        self._client = client
+        self.reprobe_interval = reprobe_interval
+        # Loop time until which the backend is assumed not to accept batches
+        self._unsupported_until: Optional[float] = None
+        self._pending: Dict[Tuple, List[PendingPrompt]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self._flushes: set = set()
+
+    @property
+    def client(self) -> LLMClient:
+        # Resolved per call so set_llm_client() also redirects batched traffic
+        return self._client or get_llm_client()
+
+    @property
+    def supports_batching(self) -> bool:
+        if self._unsupported_until is None:
+            return True
+        if asyncio.get_running_loop().time() >= self._unsupported_until:
+            # Cooldown over: the next batch probes the backend again
+            self._unsupported_until = None
+            return True
+        return False
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and self.supports_batching
+
+    def _url(self) -> str:
+        if self.batch_url:
+            return self.batch_url
+        return self.client.api_url.replace("/chat/completions", "/completions")
+
+    async def complete(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        deadline: float = DEFAULT_DEADLINE
+    ) -> Optional[str]:
+        """Same contract as LLMClient.complete without streaming: text, or None on failure"""
+        if not self.enabled:
+            return await self.client.complete(
+                prompt, system=system, model=model, temperature=temperature,
+                max_tokens=max_tokens, deadline=deadline
+            )
+
+        key = (model or self.client.model, temperature, max_tokens)
+        text = f"{system}\n\n{prompt}" if system else prompt
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._enqueue(key, PendingPrompt(text, future, loop.time() + deadline))
+
+        try:
+            # Shielded so one caller's deadline doesn't cancel the shared batch
+            return await asyncio.wait_for(asyncio.shield(future), timeout=deadline)
+        except asyncio.TimeoutError:
+            return None
+
+    def _enqueue(self, key: Tuple, item: PendingPrompt):
+        group = self._pending.setdefault(key, [])
+        group.append(item)
+
+        if len(group) >= self.max_size:
+            self._flush_now(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.window, self._flush_now, key)
+
+    def _flush_now(self, key: Tuple):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._pending.pop(key, None)
+        if group:
+            task = asyncio.create_task(self._send(key, group))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _send(self, key: Tuple, group: List[PendingPrompt]):
+        model, temperature, max_tokens = key
+        LLM_BATCH_SIZE.observe(len(group))
+        results: List[Optional[str]] = [None] * len(group)
+
+        if self.supports_batching:
+            results = await self._send_batch(model, temperature, max_tokens, group)
+
+        # Whatever the batch could not answer goes out individually, in the time its caller has left
+        now = asyncio.get_running_loop().time()
+        missing = [idx for idx, result in enumerate(results) if result is None and group[idx].deadline > now]
+        if missing:
+            retries = await asyncio.gather(*(
+                self.client.chat(
+                    [{"role": "user", "content": group[idx].prompt}],
+                    model=model, temperature=temperature, max_tokens=max_tokens,
+                    deadline=group[idx].deadline - now
+                )
+                for idx in missing
+            ))
+            for idx, result in zip(missing, retries):
+                results[idx] = result
+
+        for item, result in zip(group, results):
+            if not item.future.done():
+                item.future.set_result(result)
+
+    async def _send_batch(self, model: str, temperature: float, max_tokens: Optional[int], group: List[PendingPrompt]) -> List[Optional[str]]:
+        payload = {
+            "model": model,
+            "prompt": [item.prompt for item in group],
+            "temperature": temperature
+        }
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+
+        results: List[Optional[str]] = [None] * len(group)
+        loop = asyncio.get_running_loop()
+        # Nobody waits past the latest caller deadline in the group
+        response = await self.client.post(
+            self._url(), payload, deadline=max(item.deadline for item in group) - loop.time()
+        )
+        if response is None:
+            LLM_BATCHES.inc(outcome="error")
+            return results
+
+        if response.status_code in UNSUPPORTED_STATUSES:
+            self._unsupported_until = loop.time() + self.reprobe_interval
+            LLM_BATCHES.inc(outcome="unsupported")
+            return results
+        if response.status_code != 200:
+            LLM_BATCHES.inc(outcome="error")
+            return results
+
+        try:
+            data = response.json()
+            for choice in data["choices"]:
+                idx = choice["index"]
+                if 0 <= idx < len(group) and choice.get("text"):
+                    results[idx] = choice["text"]
+        except (ValueError, KeyError, TypeError):
+            LLM_BATCHES.inc(outcome="error")
+            return results
+
+        record_usage(model, data.get("usage"))
+        LLM_BATCHES.inc(outcome="ok")
+        return results
+
+
+_shared_batcher: Optional[LLMBatcher] = None
+
+
+def get_llm_batcher() -> LLMBatcher:
+    """Return the process-wide batcher used by candidate and evaluation agents"""
+    global _shared_batcher
+    if _shared_batcher is None:
+        _shared_batcher = LLMBatcher()
+    return _shared_batcher
+
+
+def set_llm_batcher(batcher: LLMBatcher):
+    global _shared_batcher
+    _shared_batcher = batcher
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import os
+from typing import Callable, List, Dict, Optional
+import httpx
+from metrics import LLM_TOKENS, span
+
+API_KEY = os.environ.get("OPENROUTER_API_KEY", "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")
+API_URL = os.environ.get("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+MODEL = "qwen/qwen-2.5-7b-instruct"
+
+# Connection pool shared by every agent in the process
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 30.0
+CONNECT_TIMEOUT = 10.0
+DEFAULT_DEADLINE = 30.0
+
+
+def request_timeout(deadline: float) -> httpx.Timeout:
+    """Per-request httpx timeout, so the caller's deadline and not the pool default bounds the read"""
+    return httpx.Timeout(deadline, connect=min(CONNECT_TIMEOUT, deadline))
+
+
+def record_usage(model: str, usage: Optional[Dict]):
+    """Count the tokens a provider reports for one completion"""
+    if not isinstance(usage, dict):
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if isinstance(usage.get(kind), int):
+            LLM_TOKENS.inc(usage[kind], model=model, kind=kind[:-len("_tokens")])
+
+
+class LLMClient:
+    """Async OpenRouter chat-completions client with a keep-alive connection pool"""
+
+    def __init__(
+        self,
+        api_url: str = API_URL,
+        api_key: str = API_KEY,
+        model: str = MODEL,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.model = model
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Lazily create the pooled HTTP client"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                limits=self.limits,
+                timeout=httpx.Timeout(DEFAULT_DEADLINE, connect=CONNECT_TIMEOUT),
+                transport=self.transport
+            )
+        return self._client
+
+    def _build_payload(
+        self,
+        messages: List[Dict],
+        model: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int]
+    ) -> Dict:
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": temperature
+        }
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        return payload
+
+    async def post(self, url: str, payload: Dict, deadline: float = DEFAULT_DEADLINE) -> Optional[httpx.Response]:
+        """POST a JSON payload through the pool to another endpoint of the provider; None on transport failure or timeout"""
+        with span("llm.post", model=payload.get("model")):
+            try:
+                return await asyncio.wait_for(
+                    self._get_client().post(url, json=payload, timeout=request_timeout(deadline)),
+                    timeout=deadline
+                )
+            except (httpx.HTTPError, asyncio.TimeoutError):
+                return None
+
+    async def chat(
+        self,
+        messages: List[Dict],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        deadline: float = DEFAULT_DEADLINE
+    ) -> Optional[str]:
+        """Run one chat completion, returning None on any failure or missed deadline"""
+        payload = self._build_payload(messages, model, temperature, max_tokens)
+
+        with span("llm.chat", model=payload["model"]):
+            try:
+                response = await asyncio.wait_for(
+                    self._get_client().post(self.api_url, json=payload, timeout=request_timeout(deadline)),
+                    timeout=deadline
+                )
+            except (httpx.HTTPError, asyncio.TimeoutError):
+                return None
+
+        if response.status_code != 200:
+            return None
+
+        try:
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
+
+        record_usage(payload["model"], data.get("usage"))
+        return content
+
+    async def stream(
+        self,
+        messages: List[Dict],
+        on_delta: Callable[[str], None],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        deadline: float = DEFAULT_DEADLINE
+    ) -> Optional[str]:
+        """Run a streaming chat completion, passing each text fragment to on_delta.
+
+        Returns the full text once the stream ends, or None on failure or a
+        missed deadline (fragments already forwarded are not retracted).
+        """
+        payload = self._build_payload(messages, model, temperature, max_tokens)
+        payload["stream"] = True
+
+        with span("llm.stream", model=payload["model"]):
+            try:
+                return await asyncio.wait_for(self._consume_stream(payload, on_delta, deadline), timeout=deadline)
+            except (httpx.HTTPError, asyncio.TimeoutError):
+                return None
+
+    async def _consume_stream(self, payload: Dict, on_delta: Callable[[str], None], deadline: float) -> Optional[str]:
+        parts = []
+
+        async with self._get_client().stream(
+            "POST", self.api_url, json=payload, timeout=request_timeout(deadline)
+        ) as response:
+            if response.status_code != 200:
+                return None
+
+            async for line in response.aiter_lines():
+                # Skip blank separators and SSE comments (provider keep-alives)
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+
+                # Providers report usage on the final chunk, which may have no choices
+                if isinstance(chunk, dict) and chunk.get("usage"):
+                    record_usage(payload["model"], chunk["usage"])
+
+                try:
+                    delta = chunk["choices"][0]["delta"].get("content")
+                except (KeyError, IndexError, TypeError, AttributeError):
+                    continue
+
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+
+        return "".join(parts) if parts else None
+
+    async def complete(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> Optional[str]:
+        """Convenience wrapper for a single user prompt with an optional system prompt.
+
+        Streams when on_delta is given.
+        """
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        if on_delta is not None:
+            return await self.stream(messages, on_delta, **kwargs)
+        return await self.chat(messages, **kwargs)
+
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_shared_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide client used by all agents"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = LLMClient()
+    return _shared_client
+
+
+def set_llm_client(client: LLMClient):
+    """Replace the process-wide client (e.g. to point agents at another backend)"""
+    global _shared_client
+    _shared_client = client
+
+
+async def close_llm_client():
+    """Close the process-wide client on shutdown"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
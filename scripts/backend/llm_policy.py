@@ -0,0 +1,262 @@
+import asyncio
+import os
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+from llm_batcher import get_llm_batcher
+from llm_client import get_llm_client, MODEL
+from llm_scheduler import LLMOverloaded, get_llm_scheduler
+from metrics import LLM_CIRCUIT_OPEN, LLM_HEDGES_FIRED, LLM_HEDGES_WON, LLM_MODEL_FALLBACKS
+
+# End-to-end latency budget per purpose, in seconds, including hedges and fallback
+LATENCY_BUDGETS = {
+    "reply": 12.0,
+    "topic": 15.0,
+    "summary": 20.0,
+    "evaluation": 45.0
+}
+
+# Optional secondary model used while the primary's circuit is open or after it fails
+FALLBACK_MODEL = os.environ.get("GD_LLM_FALLBACK_MODEL") or None
+
+# A hedge fires once a call has run longer than the recent p95 for its purpose
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.5
+# Used until enough samples exist, as a fraction of the budget
+HEDGE_DEFAULT_FRACTION = 0.5
+LATENCY_WINDOW = 200
+
+# Share of the budget the primary model gets when a fallback model is configured
+PRIMARY_BUDGET_SHARE = 0.7
+
+# Consecutive failures that open a circuit, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30.0
+
+
+class LatencyTracker:
+    """Recent successful call latencies for one purpose"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial call through after the timeout
+
+    Times come from the event loop's clock, so the reset timeout also passes
+    on virtual time in simulations.
+    """
+
+    def __init__(self, model: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.model = model
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        # Half-open: a single trial request decides whether to close again
+        if asyncio.get_running_loop().time() - self.opened_at >= self.reset_timeout and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self):
+        """Give up the half-open trial without a verdict so the next call can try again"""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        LLM_CIRCUIT_OPEN.set(0, model=self.model)
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = asyncio.get_running_loop().time()
+            LLM_CIRCUIT_OPEN.set(1, model=self.model)
+
+
+class LLMPolicy:
+    """Per-purpose budgets, hedged requests, circuit breaking and model fallback for agent calls
+
+    complete() returns None when neither model produced text within the
+    budget; callers then use their canned fallback, as before.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, float]] = None, fallback_model: Optional[str] = FALLBACK_MODEL):
+        self.budgets = dict(LATENCY_BUDGETS, **(budgets or {}))
+        self.fallback_model = fallback_model
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        breaker = self.breakers.get(model)
+        if breaker is None:
+            breaker = self.breakers[model] = CircuitBreaker(model)
+        return breaker
+
+    def hedge_delay(self, purpose: str, budget: float) -> float:
+        tracker = self.latencies.setdefault(purpose, LatencyTracker())
+        p95 = tracker.p95()
+        if p95 is None:
+            return budget * HEDGE_DEFAULT_FRACTION
+        return max(HEDGE_MIN_DELAY, p95)
+
+    async def complete(
+        self,
+        purpose: str,
+        prompt: str,
+        system: Optional[str] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        model: str = MODEL,
+        budget: Optional[float] = None,
+        **kwargs
+    ) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (budget or self.budgets[purpose])
+
+        models = [model]
+        if self.fallback_model and self.fallback_model != model:
+            models.append(self.fallback_model)
+
+        for idx, candidate in enumerate(models):
+            breaker = self.breaker(candidate)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            # Fail fast past an unhealthy model instead of waiting out its timeout
+            if not breaker.allow():
+                continue
+            if idx > 0:
+                LLM_MODEL_FALLBACKS.inc(purpose=purpose, model=candidate)
+
+            # Leave the fallback model time to answer if the primary fails
+            if idx < len(models) - 1 and on_delta is None:
+                remaining *= PRIMARY_BUDGET_SHARE
+
+            started = loop.time()
+            try:
+                content = await self._call(purpose, prompt, system, on_delta, candidate, remaining, **kwargs)
+            except LLMOverloaded:
+                # Shed locally; says nothing about the model's health
+                breaker.release_trial()
+                return None
+            except asyncio.CancelledError:
+                # The caller gave up (session ended, speculation discarded, deadline hit)
+                breaker.release_trial()
+                raise
+            if content is not None:
+                breaker.record_success()
+                self.latencies.setdefault(purpose, LatencyTracker()).record(loop.time() - started)
+                return content
+            breaker.record_failure()
+
+            # Streamed fragments can't be retracted, so a failed stream isn't retried
+            if on_delta is not None:
+                break
+
+        return None
+
+    async def _call(
+        self,
+        purpose: str,
+        prompt: str,
+        system: Optional[str],
+        on_delta: Optional[Callable[[str], None]],
+        model: str,
+        budget: float,
+        **kwargs
+    ) -> Optional[str]:
+        scheduler = get_llm_scheduler()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget
+
+        if on_delta is not None:
+            async with scheduler.slot(purpose, timeout=budget):
+                return await get_llm_client().complete(
+                    prompt, system=system, on_delta=on_delta, model=model,
+                    deadline=deadline - loop.time(), **kwargs
+                )
+
+        async def attempt() -> Optional[str]:
+            return await get_llm_batcher().complete(
+                prompt, system=system, model=model, deadline=deadline - loop.time(), **kwargs
+            )
+
+        async def hedge() -> Optional[str]:
+            try:
+                await scheduler.acquire(purpose, timeout=deadline - loop.time())
+            except LLMOverloaded:
+                return None
+            try:
+                return await attempt()
+            finally:
+                scheduler.release()
+
+        # Queueing for the first slot counts against the budget; shedding propagates
+        await scheduler.acquire(purpose, timeout=budget)
+        primary = asyncio.create_task(attempt())
+        # A done callback releases the slot even if the task is cancelled before it runs
+        primary.add_done_callback(lambda _: scheduler.release())
+        tasks = {primary}
+
+        try:
+            hedge_delay = self.hedge_delay(purpose, budget)
+            # A hedge due at or past the deadline could never start; just wait on the first request
+            if hedge_delay < deadline - loop.time():
+                done, _ = await asyncio.wait(tasks, timeout=max(0.0, hedge_delay))
+                if not done:
+                    # The first request is running long: race a second copy against it
+                    LLM_HEDGES_FIRED.inc(purpose=purpose)
+                    tasks.add(asyncio.create_task(hedge()))
+
+            pending = set(tasks)
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result() is not None:
+                        if task is not primary:
+                            LLM_HEDGES_WON.inc(purpose=purpose)
+                        return task.result()
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+_shared_policy: Optional[LLMPolicy] = None
+
+
+def get_llm_policy() -> LLMPolicy:
+    """Return the process-wide policy shared by all agents"""
+    global _shared_policy
+    if _shared_policy is None:
+        _shared_policy = LLMPolicy()
+    return _shared_policy
+
+
+def set_llm_policy(policy: LLMPolicy):
+    global _shared_policy
+    _shared_policy = policy
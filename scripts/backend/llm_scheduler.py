@@ -0,0 +1,187 @@
+import asyncio
+import heapq
+import itertools
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from metrics import LLM_IN_FLIGHT, LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT_SECONDS, LLM_SHED
+
+# Lower runs first: live users waiting on a reply beat background work
+PRIORITIES = {
+    "reply": 0,
+    "topic": 1,
+    "summary": 2,
+    "evaluation": 2
+}
+LOWEST_PRIORITY = max(PRIORITIES.values())
+
+# Calls in flight at once across the process
+LLM_MAX_CONCURRENCY = int(os.environ.get("GD_LLM_MAX_CONCURRENCY", 32))
+# Token bucket matched to the provider quota: sustained requests/second (0 disables) and burst size
+LLM_RATE_LIMIT = float(os.environ.get("GD_LLM_RATE_LIMIT", 20))
+LLM_RATE_BURST = int(os.environ.get("GD_LLM_RATE_BURST", 40))
+# Waiting calls beyond this are shed, lowest priority first
+LLM_MAX_QUEUE = int(os.environ.get("GD_LLM_MAX_QUEUE", 500))
+
+
+class LLMOverloaded(Exception):
+    """A call was shed from the queue or could not start within its budget"""
+    pass
+
+
+class LLMScheduler:
+    """Process-wide gate in front of every LLM call
+
+    A call starts when a concurrency slot and a rate-limit token are both
+    free; otherwise it queues by priority class, then arrival order. When the
+    queue is full, the newest call of the lowest class below the newcomer is
+    shed to make room, or the newcomer is shed if nothing ranks below it.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        rate: float = LLM_RATE_LIMIT,
+        burst: int = LLM_RATE_BURST,
+        max_queue: int = LLM_MAX_QUEUE
+    ):
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+
+        self.in_flight = 0
+        self.tokens = float(burst)
+        # Set on the first refill, once there is a running loop to read the time from
+        self._refilled_at: Optional[float] = None
+        # Entries are [priority, seq, purpose, future]
+        self._queue: List[list] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @staticmethod
+    def _now() -> float:
+        # The loop's clock, so the bucket refills on virtual time in simulations too
+        return asyncio.get_running_loop().time()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _refill(self):
+        if self.rate <= 0:
+            # Rate limiting disabled
+            self.tokens = float("inf")
+            return
+        now = self._now()
+        if self._refilled_at is None:
+            self._refilled_at = now
+        self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _can_start(self) -> bool:
+        return self.in_flight < self.max_concurrency and self.tokens >= 1
+
+    def _start(self):
+        self.in_flight += 1
+        self.tokens -= 1
+        LLM_IN_FLIGHT.set(self.in_flight)
+
+    async def acquire(self, purpose: str, timeout: Optional[float] = None):
+        """Wait for permission to make one call; raises LLMOverloaded if shed or timed out"""
+        self._refill()
+        if not self._queue and self._can_start():
+            self._start()
+            LLM_QUEUE_WAIT_SECONDS.observe(0, purpose=purpose)
+            return
+
+        priority = PRIORITIES.get(purpose, LOWEST_PRIORITY)
+        if len(self._queue) >= self.max_queue:
+            self._shed_for(priority, purpose)
+
+        started = self._now()
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), purpose, future]
+        heapq.heappush(self._queue, entry)
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            LLM_SHED.inc(purpose=purpose, reason="timeout")
+            raise LLMOverloaded(f"{purpose} call did not start within {timeout}s")
+        except asyncio.CancelledError:
+            # Granted just as the waiter was cancelled: hand the slot back
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            elif entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            raise
+        finally:
+            LLM_QUEUE_WAIT_SECONDS.observe(self._now() - started, purpose=purpose)
+
+    def _shed_for(self, priority: int, purpose: str):
+        worst = max(self._queue, key=lambda entry: (entry[0], entry[1]))
+        if worst[0] <= priority:
+            LLM_SHED.inc(purpose=purpose, reason="queue_full")
+            raise LLMOverloaded("LLM queue is full")
+
+        self._queue.remove(worst)
+        heapq.heapify(self._queue)
+        if not worst[3].done():
+            worst[3].set_exception(LLMOverloaded("Shed for a higher-priority call"))
+        LLM_SHED.inc(purpose=worst[2], reason="queue_full")
+
+    def release(self):
+        self.in_flight -= 1
+        LLM_IN_FLIGHT.set(self.in_flight)
+        self._dispatch()
+
+    def _dispatch(self):
+        self._refill()
+        while self._queue and self._can_start():
+            entry = heapq.heappop(self._queue)
+            # Waiters that timed out or were cancelled leave their entry behind
+            if entry[3].done():
+                continue
+            self._start()
+            entry[3].set_result(None)
+
+        # Out of tokens: come back when the next one has accrued
+        if self._queue and self.in_flight < self.max_concurrency and self._timer is None:
+            delay = (1 - self.tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, purpose: str, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        await self.acquire(purpose, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_shared_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler in front of all agent LLM calls"""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        _shared_scheduler = LLMScheduler()
+    return _shared_scheduler
+
+
+def set_llm_scheduler(scheduler: LLMScheduler):
+    global _shared_scheduler
+    _shared_scheduler = scheduler
+
+
+LLM_QUEUE_DEPTH.set_function(lambda: _shared_scheduler.queue_depth if _shared_scheduler is not None else 0)
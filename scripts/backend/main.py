@@ -1,15 +1,69 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 import asyncio
 import json
 from datetime import datetime
+import os
+import re
+import time
 import uuid
+from contextlib import asynccontextmanager
 from ai_agents import AdminAgent, CandidateAgent, AnalysisAgent
-from gd_engine import GDEngine
+from gd_engine import GDEngine, CANDIDATE_INJECTION_AT
+from llm_client import close_llm_client
+from events import SNAPSHOT, RESYNC, CLOSED
+from transcript import parse_timestamp
+from session_archive import SessionArchive
+from timer_wheel import get_timer_wheel
+from session_store import create_session_store, SessionCapacityError
+from session_pool import WarmSessionPool, TOPIC_RETRIES
+from speculation import SpeculativeResponder, speculation_stats
+from metrics import (
+    ACTIVE_SESSIONS,
+    HTTP_REQUEST_SECONDS,
+    LIVE_MESSAGES,
+    TRACING_ENABLED,
+    monitor_event_loop,
+    recent_traces,
+    render_metrics,
+    span
+)
+
+# Completed sessions on disk (GD_ARCHIVE_DIR), so memory only holds live ones
+session_archive = SessionArchive()
+
+def archive_session(engine: GDEngine):
+    session_archive.archive(engine)
+
+# Store active GD sessions (GD_SESSION_BACKEND=sqlite shares them between workers)
+active_sessions = create_session_store(on_evict=archive_session)
+
+# Pre-built sessions with topics ready (sized by GD_WARM_POOL_SIZE)
+warm_pool = WarmSessionPool()
 
-app = FastAPI(title="AI GD Simulation Platform")
+# Most sessions one cohort request may create or end
+MAX_COHORT_SIZE = int(os.environ.get("GD_MAX_COHORT_SIZE", 100))
+# Names the engine gives Admin and AI candidates, so humans can't take them
+RESERVED_NAME = re.compile(r"^(admin|candidate \d+)$", re.IGNORECASE)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await active_sessions.start()
+    await warm_pool.start()
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    yield
+    loop_monitor.cancel()
+    get_timer_wheel().close()
+    await warm_pool.stop()
+    await active_sessions.stop()
+    await session_archive.flush()
+    # Release pooled LLM connections
+    await close_llm_client()
+
+app = FastAPI(title="AI GD Simulation Platform", lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -20,12 +74,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store active GD sessions
-active_sessions: Dict[str, GDEngine] = {}
+ACTIVE_SESSIONS.set_function(lambda: len(active_sessions))
+LIVE_MESSAGES.set_function(lambda: sum(len(engine.messages) for engine in active_sessions.loaded()))
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route latency histogram, plus a root tracing span when GD_TRACING=1"""
+    started = time.perf_counter()
+    # A handler that raises is recorded as a 500
+    status = 500
+    try:
+        with span("http.request", method=request.method, path=request.url.path):
+            response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so session ids don't explode the series count
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status
+        )
 
 # Pydantic models
 class CreateSessionRequest(BaseModel):
     session_id: Optional[str] = None
+    streaming: bool = False
+    batched_evaluation: bool = False
+    rolling_evaluation: bool = False
+    speculative: bool = False
+    autonomous: bool = False
+
+class CreateCohortRequest(BaseModel):
+    count: int = Field(ge=1, le=MAX_COHORT_SIZE)
+    # Applied to every session; session_id is ignored
+    settings: CreateSessionRequest = CreateSessionRequest()
+    # Human names per session (default one "YOU"); AI candidates fill the other seats
+    humans: Optional[List[List[str]]] = None
+    # One topic shared by all, or assigned round-robin; generated per session when omitted
+    topics: Optional[List[str]] = None
+    # Generate one topic for the whole cohort instead of one per session
+    shared_topic: bool = False
+    start: bool = True
+
+class EndCohortRequest(BaseModel):
+    session_ids: List[str] = Field(max_length=MAX_COHORT_SIZE)
 
 class MessageRequest(BaseModel):
     session_id: str
@@ -33,6 +128,12 @@ class MessageRequest(BaseModel):
     message: str
     timestamp: str
 
+class TypingRequest(BaseModel):
+    session_id: str
+    participant: str
+    # Text typed so far; speculative sessions pre-generate replies to it
+    draft: Optional[str] = None
+
 class SessionResponse(BaseModel):
     session_id: str
     status: str
@@ -44,6 +145,34 @@ class SessionResponse(BaseModel):
 async def root():
     return {"message": "AI GD Simulation Platform API", "version": "1.0"}
 
+def build_engine(session_id: str, request: CreateSessionRequest, humans: Optional[List[str]] = None, pooled: bool = True) -> GDEngine:
+    """Seated engine for a new session, taken from the warm pool when possible"""
+    # Pooled sessions are built with default seating and evaluation settings
+    engine = None
+    if pooled and humans is None and not request.batched_evaluation and not request.rolling_evaluation:
+        engine = warm_pool.take(session_id)
+    
+    if engine is not None:
+        engine.streaming = request.streaming
+        engine.autonomous = request.autonomous
+        if request.speculative:
+            engine.speculation = SpeculativeResponder(engine)
+    else:
+        # Initialize GD Engine with AI agents
+        engine = GDEngine(
+            session_id,
+            streaming=request.streaming,
+            batched_evaluation=request.batched_evaluation,
+            rolling_evaluation=request.rolling_evaluation,
+            speculative=request.speculative,
+            autonomous=request.autonomous
+        )
+        if humans is None:
+            engine.seat_default_participants()
+        else:
+            engine.seat_participants(humans)
+    return engine
+
 @app.post("/api/session/create", response_model=SessionResponse)
 async def create_session(request: CreateSessionRequest):
     """Create a new GD session"""
@@ -52,16 +181,14 @@ async def create_session(request: CreateSessionRequest):
     if session_id in active_sessions:
         raise HTTPException(status_code=400, detail="Session already exists")
     
-    # Initialize GD Engine with AI agents
-    engine = GDEngine(session_id)
-    active_sessions[session_id] = engine
+    engine = build_engine(session_id, request)
     
-    # Add human participant "YOU"
-    engine.add_participant("YOU", is_human=True)
-    
-    # Add initial AI candidates (minimum 4 more to make 5 total)
-    for i in range(4):
-        engine.add_ai_candidate()
+    try:
+        await active_sessions.add(engine)
+    except SessionCapacityError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Session already exists")
     
     return SessionResponse(
         session_id=session_id,
@@ -71,100 +198,309 @@ async def create_session(request: CreateSessionRequest):
         participants=engine.get_participants()
     )
 
+@app.post("/api/cohort/create")
+async def create_cohort(request: CreateCohortRequest):
+    """Create a group of sessions at once, prepare their topics concurrently and optionally start them"""
+    if request.humans is not None:
+        if len(request.humans) != request.count:
+            raise HTTPException(status_code=400, detail="humans must list one group per session")
+        for group in request.humans:
+            # Participation stats are keyed by name, so names must be unique in a session
+            if len(set(group)) != len(group):
+                raise HTTPException(status_code=400, detail="Duplicate human names in a group")
+            reserved = [name for name in group if RESERVED_NAME.match(name.strip())]
+            if reserved:
+                raise HTTPException(status_code=400, detail=f"Reserved participant names: {', '.join(reserved)}")
+    
+    # Pooled engines already carry a generated topic of their own
+    pooled = request.topics is None and not request.shared_topic
+    engines = [
+        build_engine(
+            str(uuid.uuid4()),
+            request.settings,
+            humans=request.humans[idx] if request.humans is not None else None,
+            pooled=pooled
+        )
+        for idx in range(request.count)
+    ]
+    
+    if request.topics:
+        for idx, engine in enumerate(engines):
+            engine.prepared_announcement = engine.admin_agent.announce_given_topic(request.topics[idx % len(request.topics)])
+    elif request.shared_topic:
+        announcement = await engines[0].admin_agent.announce_topic(retries=TOPIC_RETRIES)
+        for engine in engines:
+            engine.prepared_announcement = dict(announcement)
+    else:
+        # Concurrent calls still diverge: a topic another session took first is regenerated
+        await asyncio.gather(*(
+            engine.prepare(topic_retries=TOPIC_RETRIES)
+            for engine in engines if engine.prepared_announcement is None
+        ))
+    
+    # All or nothing, so a full store doesn't leave half a cohort behind
+    added = []
+    try:
+        for engine in engines:
+            await active_sessions.add(engine)
+            added.append(engine)
+    except SessionCapacityError as e:
+        for engine in added:
+            await active_sessions.remove(engine.session_id)
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    async def start(session_id: str) -> Dict:
+        engine = active_sessions.get(session_id)
+        if engine is None:
+            return {"status": "not_found"}
+        return await engine.start_discussion()
+    
+    sessions = [
+        {
+            "session_id": engine.session_id,
+            "status": "initialized",
+            "topic": engine.prepared_announcement["topic"],
+            "participants": engine.get_participants()
+        }
+        for engine in engines
+    ]
+    if request.start:
+        # One failed start shouldn't fail the others, which are already stored
+        results = await asyncio.gather(*(start(engine.session_id) for engine in engines), return_exceptions=True)
+        for session, result in zip(sessions, results):
+            if isinstance(result, BaseException):
+                session.update({"status": "error", "detail": str(result)})
+            else:
+                session.update(result)
+    
+    return {"sessions": sessions}
+
 @app.post("/api/session/start")
 async def start_session(session_id: str):
     """Start the GD session - Admin announces topic and begins"""
-    if session_id not in active_sessions:
+    engine = active_sessions.get(session_id)
+    if engine is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    engine = active_sessions[session_id]
-    result = await engine.start_discussion()
-    
-    return result
+    # Takes the session transaction only around its state changes, not the LLM call
+    return await engine.start_discussion()
 
 @app.post("/api/message/send")
 async def send_message(request: MessageRequest):
-    """Handle human participant message and trigger AI responses"""
-    if request.session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    engine = active_sessions[request.session_id]
-    
-    # Process human message
-    engine.add_message(request.participant, request.message, request.timestamp)
-    
-    # Track for evaluation
-    engine.track_participation(request.participant, request.message)
+    """Handle human participant message and schedule AI responses"""
+    async with active_sessions.transaction(request.session_id) as engine:
+        if engine is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        # Process human message; the lock orders concurrent senders
+        record = engine.add_message(request.participant, request.message, parse_timestamp(request.timestamp))
+        
+        # Track for evaluation
+        engine.track_participation(request.participant, request.message)
     
-    # Trigger AI candidate responses
-    ai_responses = await engine.generate_ai_responses(request.message)
+    # Queue AI candidate responses in the session's mailbox; they show up in
+    # the transcript as they are delivered
+    engine.respond_to_message(record)
     
+    # ai_responses stays for existing clients; replies arrive through status and events
     return {
         "status": "success",
-        "ai_responses": ai_responses,
+        "ai_responses": [],
+        "ai_responses_pending": True,
         "elapsed_time": engine.get_elapsed_time()
     }
 
+@app.post("/api/session/typing")
+async def typing(request: TypingRequest):
+    """Typing signal from a human; lets speculative sessions pre-generate replies"""
+    if request.session_id not in active_sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    engine = active_sessions[request.session_id]
+    if engine.turn_scheduler is not None:
+        engine.turn_scheduler.on_human_activity()
+    speculating = engine.speculation.on_typing(request.draft) if engine.speculation is not None else False
+    return {"status": "success", "speculating": speculating}
+
+@app.get("/api/speculation/stats")
+async def get_speculation_stats():
+    """Hit/miss/waste counters for speculative replies"""
+    return speculation_stats.to_dict()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for this worker process"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/debug/traces")
+async def get_traces(limit: int = 20):
+    """Most recent request traces (requires GD_TRACING=1)"""
+    if not TRACING_ENABLED:
+        raise HTTPException(status_code=404, detail="Tracing is disabled")
+    return {"traces": recent_traces(limit)}
+
 @app.get("/api/session/{session_id}/status")
-async def get_session_status(session_id: str):
-    """Get current session status"""
+async def get_session_status(session_id: str, request: Request, since: int = 0):
+    """Get current session status
+    
+    Only messages with seq greater than `since` are returned; pass back the
+    returned `cursor` on the next poll. Unchanged state answers 304 to a
+    matching If-None-Match (elapsed_time is not part of the ETag).
+    """
     if session_id not in active_sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
     engine = active_sessions[session_id]
     
-    return {
+    etag = f'W/"{engine.version}-{since}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return ORJSONResponse({
         "session_id": session_id,
         "status": engine.status,
         "topic": engine.topic,
+        "start_time": engine.start_time.isoformat() if engine.start_time else None,
         "elapsed_time": engine.get_elapsed_time(),
         "participants": engine.get_participants(),
-        "messages": engine.messages
-    }
+        "messages": engine.messages_since(since),
+        "cursor": engine.message_seq
+    }, headers={"ETag": etag})
+
+@app.websocket("/ws/session/{session_id}")
+async def session_events(websocket: WebSocket, session_id: str):
+    """Push session events: a snapshot first, then incremental updates"""
+    if session_id not in active_sessions:
+        await websocket.close(code=4404)
+        return
+    
+    engine = active_sessions[session_id]
+    await websocket.accept()
+    
+    # Subscribe before taking the snapshot so no event falls in between;
+    # queued events the snapshot already covers are skipped by seq
+    queue = engine.events.subscribe()
+    
+    async def forward_events():
+        snapshot = engine.snapshot()
+        await websocket.send_json({"type": SNAPSHOT, "data": snapshot})
+        while True:
+            event = await queue.get()
+            if event is CLOSED:
+                await websocket.close()
+                return
+            if event is RESYNC:
+                snapshot = engine.snapshot()
+                event = {"type": SNAPSHOT, "data": snapshot}
+            elif event["seq"] <= snapshot["version"]:
+                continue
+            await websocket.send_json(event)
+    
+    async def watch_disconnect():
+        # Clients don't need to send anything; this only detects disconnects
+        while True:
+            await websocket.receive_text()
+    
+    tasks = {asyncio.create_task(forward_events()), asyncio.create_task(watch_disconnect())}
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            # Disconnects surface here as WebSocketDisconnect or a failed send
+            task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        engine.events.unsubscribe(queue)
 
 @app.post("/api/session/end")
 async def end_session(session_id: str):
     """End the GD session and generate evaluation report"""
+    engine = active_sessions.get(session_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Generate comprehensive evaluation; messages keep flowing while it runs
+    return await engine.end_discussion()
+
+@app.get("/api/session/{session_id}/provisional-evaluation")
+async def provisional_evaluation(session_id: str):
+    """Instant heuristic scores while the discussion runs or the full report is generated"""
     if session_id not in active_sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    engine = active_sessions[session_id]
+    return active_sessions[session_id].provisional_evaluation()
+
+@app.post("/api/cohort/end")
+async def end_cohort(request: EndCohortRequest):
+    """End many sessions concurrently, streaming each evaluation as NDJSON as soon as it is ready"""
+    
+    async def end(session_id: str) -> Dict:
+        try:
+            engine = active_sessions.get(session_id)
+            if engine is None:
+                return {"session_id": session_id, "status": "not_found"}
+            result = await engine.end_discussion()
+        except Exception as e:
+            # One failed session shouldn't cut off the rest of the stream
+            return {"session_id": session_id, "status": "error", "detail": str(e)}
+        return {"session_id": session_id, **result}
     
-    # Generate comprehensive evaluation
-    evaluation = await engine.end_discussion()
+    # Ending continues even if the client disconnects mid-stream
+    tasks = [asyncio.create_task(end(session_id)) for session_id in dict.fromkeys(request.session_ids)]
     
-    return evaluation
+    async def results():
+        for task in asyncio.as_completed(tasks):
+            yield json.dumps(await task) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
 
 @app.get("/api/session/{session_id}/inject-candidates")
 async def inject_candidates(session_id: str):
-    """Inject additional AI candidates at 5-minute mark"""
-    if session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    engine = active_sessions[session_id]
-    
-    # Check if 5 minutes elapsed
-    if engine.get_elapsed_time() >= 300:  # 5 minutes
-        human_count = engine.get_human_count()
-        
-        if human_count == 1:
-            # Add 2 candidates
-            engine.add_ai_candidate()
-            engine.add_ai_candidate()
-        elif human_count == 2:
-            # Add 1 candidate
-            engine.add_ai_candidate()
-        # If 3+, add 0
+    """Inject additional AI candidates at 5-minute mark (also done server-side by the timer wheel)"""
+    async with active_sessions.transaction(session_id) as engine:
+        if engine is None:
+            raise HTTPException(status_code=404, detail="Session not found")
         
+        # The timer wheel does this at the 5-minute mark; early polls are no-ops
+        if engine.get_elapsed_time() >= CANDIDATE_INJECTION_AT:
+            engine.inject_candidates()
+    
     return {"status": "success", "participants": engine.get_participants()}
 
 @app.delete("/api/session/{session_id}")
 async def delete_session(session_id: str):
-    """Clean up session"""
-    if session_id in active_sessions:
-        del active_sessions[session_id]
+    """Clean up session; completed sessions are archived rather than lost
+    
+    An evaluation still running is committed before the session is dropped.
+    """
+    engine = await active_sessions.remove(session_id)
+    if engine is not None and engine.status == "completed":
+        archive_session(engine)
+        return {"status": "archived"}
     return {"status": "deleted"}
 
+@app.get("/api/archive/sessions")
+async def list_archived_sessions():
+    """Stream every archived session's id, topic and archive time as NDJSON"""
+    return StreamingResponse(session_archive.iter_index(), media_type="application/x-ndjson")
+
+@app.get("/api/archive/sessions/{session_id}/report")
+async def get_archived_report(session_id: str):
+    """Evaluation, participants and participation stats of an archived session"""
+    entry = await session_archive.find(session_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Archived session not found")
+    return ORJSONResponse(await asyncio.to_thread(session_archive.read_report, entry))
+
+@app.get("/api/archive/sessions/{session_id}/transcript")
+async def get_archived_transcript(session_id: str):
+    """Stream an archived transcript as NDJSON, one message per line"""
+    entry = await session_archive.find(session_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Archived session not found")
+    return StreamingResponse(session_archive.iter_messages(entry), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # More than one worker needs GD_SESSION_BACKEND=sqlite
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=int(os.environ.get("GD_WORKERS", 1)))
@@ -0,0 +1,284 @@
+"""Process-local metrics in the Prometheus text format, plus optional tracing spans.
+
+Metrics are per process: with several workers, scrape each one (or run a
+single worker while profiling).
+"""
+import asyncio
+import contextvars
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond routes up to slow evaluations
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+LOOP_LAG_INTERVAL = 0.5
+
+# GD_TRACING=1 records spans for every request; the latest are kept in memory
+TRACING_ENABLED = os.environ.get("GD_TRACING") == "1"
+TRACE_BUFFER_SIZE = 2000
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _label_values(names: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels[name]).replace("\\", "\\\\").replace('"', '\\"') for name in names)
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        REGISTRY.append(self)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        pass
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, description, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_values(self.labels, labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labels, key)} {value}"
+
+
+class Gauge(Metric):
+    """Gauge set directly or computed at scrape time from a callback"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, description, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.callback: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        self.values[_label_values(self.labels, labels)] = value
+
+    def set_function(self, callback: Callable[[], float]):
+        self.callback = callback
+
+    def samples(self) -> Iterator[str]:
+        if self.callback is not None:
+            yield f"{self.name} {self.callback()}"
+            return
+        for key, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labels, key)} {value}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_values(self.labels, labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [0] * (len(self.buckets) + 2)
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[idx] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[str]:
+        for key, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labels, key, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            labels = _format_labels(self.labels, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {series[-1]}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}"
+
+
+REGISTRY: List[Metric] = []
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "gd_http_request_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "gd_llm_request_seconds", "LLM call latency by calling agent", ("agent", "outcome")
+)
+LLM_TOKENS = Counter(
+    "gd_llm_tokens_total", "Tokens reported by the LLM provider", ("model", "kind")
+)
+LLM_FALLBACKS = Counter(
+    "gd_llm_fallbacks_total", "Canned responses used instead of LLM output", ("agent", "reason")
+)
+LLM_HEDGES_FIRED = Counter(
+    "gd_llm_hedges_fired_total", "Hedged second requests sent after the p95 delay", ("purpose",)
+)
+LLM_HEDGES_WON = Counter(
+    "gd_llm_hedges_won_total", "Hedged requests that answered before the original", ("purpose",)
+)
+LLM_MODEL_FALLBACKS = Counter(
+    "gd_llm_model_fallbacks_total", "Calls sent to the secondary model", ("purpose", "model")
+)
+LLM_CIRCUIT_OPEN = Gauge(
+    "gd_llm_circuit_open", "1 while a model's circuit breaker is open", ("model",)
+)
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "gd_llm_queue_wait_seconds", "Time LLM calls wait for a concurrency slot and rate-limit token", ("purpose",)
+)
+LLM_QUEUE_DEPTH = Gauge("gd_llm_queue_depth", "LLM calls waiting to start")
+LLM_IN_FLIGHT = Gauge("gd_llm_in_flight", "LLM calls running")
+LLM_SHED = Counter(
+    "gd_llm_shed_total", "LLM calls dropped by the scheduler", ("purpose", "reason")
+)
+LLM_BATCHES = Counter(
+    "gd_llm_batches_total", "Batched completion requests by outcome", ("outcome",)
+)
+LLM_BATCH_SIZE = Histogram(
+    "gd_llm_batch_size", "Prompts per flushed batch", buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+REPLY_ROUNDS = Counter("gd_reply_rounds_total", "Rounds of AI replies to human messages")
+COALESCED_MESSAGES = Counter(
+    "gd_coalesced_messages_total", "Human messages answered in the same reply round as an earlier one"
+)
+ENGINE_STEP_SECONDS = Histogram(
+    "gd_engine_step_seconds", "Duration of GDEngine steps", ("step",)
+)
+REPLY_PACING_SECONDS = Counter(
+    "gd_reply_pacing_seconds_total", "Time spent in deliberate pauses between AI speakers"
+)
+SESSIONS_ARCHIVED = Counter(
+    "gd_sessions_archived_total", "Completed sessions written to the on-disk archive", ("outcome",)
+)
+SESSION_TIMERS_PENDING = Gauge("gd_session_timers_pending", "Session deadlines scheduled on the timer wheel")
+SESSION_TIMERS_FIRED = Counter(
+    "gd_session_timers_fired_total", "Session deadlines reached, by event", ("event",)
+)
+ACTIVE_SESSIONS = Gauge("gd_active_sessions", "Sessions held by the session store")
+LIVE_MESSAGES = Gauge("gd_live_messages", "Transcript messages held in this process")
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "gd_event_loop_lag_seconds", "How late the event loop wakes a sleeping task", buckets=LAG_BUCKETS
+)
+
+
+def render_metrics() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def record_llm_call(agent: str, started: float, content: Optional[str]):
+    """Record the latency of one agent-level LLM call; None content means it failed"""
+    outcome = "ok" if content is not None else "error"
+    LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, agent=agent, outcome=outcome)
+
+
+async def monitor_event_loop(interval: float = LOOP_LAG_INTERVAL):
+    """Sample event-loop lag until cancelled"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - expected))
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start", "duration")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, attributes: Dict):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "start": self.start,
+            "duration_ms": None if self.duration is None else self.duration * 1000
+        }
+
+
+finished_spans: deque = deque(maxlen=TRACE_BUFFER_SIZE)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Tracing span nested under the current one; a no-op unless tracing is enabled"""
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(parent.trace_id if parent else uuid.uuid4().hex, parent.span_id if parent else None, name, attributes)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        finished_spans.append(current)
+
+
+def recent_traces(limit: int = 20) -> List[Dict]:
+    """Latest traces, each with its spans in start order"""
+    traces: Dict[str, List[Dict]] = {}
+    for item in reversed(finished_spans):
+        if item.trace_id not in traces:
+            if len(traces) >= limit:
+                continue
+            traces[item.trace_id] = []
+        traces[item.trace_id].append(item.to_dict())
+    return [
+        {"trace_id": trace_id, "spans": sorted(spans, key=lambda s: s["start"])}
+        for trace_id, spans in traces.items()
+    ]
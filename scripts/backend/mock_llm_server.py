@@ -0,0 +1,246 @@
+"""Local stand-in for the OpenRouter chat-completions endpoint.
+
+Serves deterministic canned outputs for every prompt the agents send (topic
+announcements, candidate replies, per-participant and batched evaluation
+JSON), with configurable latency, error rate and SSE streaming. The legacy
+/v1/completions endpoint accepts a list of prompts for micro-batching.
+
+Run standalone and point the backend at it:
+    python mock_llm_server.py --port 9000 --latency lognormal:0.8,0.5 --error-rate 0.02
+    OPENROUTER_API_URL=http://localhost:9000/v1/chat/completions python main.py
+
+or mount create_app() in-process through httpx.ASGITransport (see bench_load.py).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+TOPICS = [
+    "Should AI replace human jobs in the next decade?",
+    "Is remote work here to stay for engineering teams?",
+    "Should India prioritise electric vehicles over public transport?",
+    "Are coding bootcamps a substitute for engineering degrees?",
+    "Should social media platforms be liable for misinformation?",
+    "Is cryptocurrency a threat to the banking system?",
+    "Should startups be preferred over MNCs by fresh graduates?",
+    "Is a four-day work week good for productivity?"
+]
+
+REPLIES = [
+    "I see the point, but we should also look at the data on productivity before deciding.",
+    "Building on what was just said, the real issue is how we reskill the workforce.",
+    "I respectfully disagree; the costs to small businesses are being underestimated here.",
+    "A balanced approach would combine regulation with incentives for innovation.",
+    "From a practical standpoint, implementation matters more than the policy itself.",
+    "Let me add an example: several companies have already piloted this with mixed results."
+]
+
+STRENGTHS = ["Clear articulation", "Good use of examples", "Listened to others", "Structured arguments"]
+WEAKNESSES = ["Could take more initiative", "Needs more data points", "Interrupted at times"]
+SUGGESTIONS = ["Open with a clear stance", "Summarise the group's points", "Back claims with facts"]
+
+SCORE_KEYS = [
+    "communication",
+    "content_relevance",
+    "leadership",
+    "confidence",
+    "team_behavior",
+    "corporate_readiness"
+]
+
+
+class MockLLMConfig:
+    """Latency, error and streaming behaviour of the mock provider"""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0.2",
+        error_rate: float = 0.0,
+        chunk_delay: float = 0.02,
+        chunk_size: int = 12,
+        seed: int = 0,
+        batching: bool = True
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.seed = seed
+        # Serve /v1/completions with a list of prompts, like a local OpenAI-compatible server
+        self.batching = batching
+
+    @classmethod
+    def from_env(cls) -> "MockLLMConfig":
+        return cls(
+            latency=os.environ.get("MOCK_LLM_LATENCY", "fixed:0.2"),
+            error_rate=float(os.environ.get("MOCK_LLM_ERROR_RATE", 0)),
+            chunk_delay=float(os.environ.get("MOCK_LLM_CHUNK_DELAY", 0.02)),
+            seed=int(os.environ.get("MOCK_LLM_SEED", 0)),
+            batching=os.environ.get("MOCK_LLM_BATCHING", "1") == "1"
+        )
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    """Sample seconds from fixed:X, uniform:A,B, normal:MEAN,SD or lognormal:MEDIAN,SIGMA"""
+    kind, _, args = spec.partition(":")
+    params = [float(value) for value in args.split(",") if value]
+
+    if kind == "fixed":
+        return params[0]
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1])
+    if kind == "normal":
+        return max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal":
+        return params[0] * rng.lognormvariate(0, params[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _pick(options: List, digest: int, salt: int = 0):
+    return options[(digest + salt) % len(options)]
+
+
+def _evaluation(digest: int, name: Optional[str] = None) -> Dict:
+    result = {key: 5 + (digest >> (4 * idx)) % 5 for idx, key in enumerate(SCORE_KEYS)}
+    if name is not None:
+        result["name"] = name
+    result.update({
+        "strengths": [_pick(STRENGTHS, digest), _pick(STRENGTHS, digest, 1)],
+        "weaknesses": [_pick(WEAKNESSES, digest), _pick(WEAKNESSES, digest, 1)],
+        "hr_remarks": "Participated with reasonable clarity; more initiative would help.",
+        "suggestions": [_pick(SUGGESTIONS, digest), _pick(SUGGESTIONS, digest, 1)]
+    })
+    return result
+
+
+def canned_completion(prompt: str) -> str:
+    """Deterministic output for a prompt, shaped like what the calling agent expects"""
+    digest = int(hashlib.sha256(prompt.encode()).hexdigest(), 16)
+
+    if '"evaluations"' in prompt:
+        names = [line[len("Participant: "):] for line in prompt.splitlines() if line.startswith("Participant: ")]
+        return json.dumps({
+            "evaluations": [
+                _evaluation(int(hashlib.sha256(name.encode()).hexdigest(), 16), name)
+                for name in names
+            ]
+        })
+    if "running summary" in prompt:
+        return "Argued that the change needs careful, data-driven rollout; gave industry examples and built on others' points about reskilling."
+    if "HR evaluator" in prompt:
+        return json.dumps(_evaluation(digest))
+    if '"topic"' in prompt:
+        topic = _pick(TOPICS, digest)
+        return json.dumps({
+            "topic": topic,
+            "message": f"Good morning everyone. Today's topic is: {topic} Please keep it professional and listen to each other. You may begin."
+        })
+    return _pick(REPLIES, digest)
+
+
+def create_app(config: Optional[MockLLMConfig] = None) -> FastAPI:
+    config = config or MockLLMConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Mock LLM")
+    app.state.requests = 0
+    app.state.batches = 0
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        prompt = body["messages"][-1]["content"]
+
+        await asyncio.sleep(sample_latency(config.latency, rng))
+        if rng.random() < config.error_rate:
+            return JSONResponse({"error": {"message": "mock upstream error"}}, status_code=503)
+
+        content = canned_completion(prompt)
+        usage = {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(content.split()),
+            "total_tokens": len(prompt.split()) + len(content.split())
+        }
+
+        if not body.get("stream"):
+            return {
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage
+            }
+
+        async def events():
+            yield ": MOCK PROCESSING\n\n"
+            for start in range(0, len(content), config.chunk_size):
+                chunk = {"choices": [{"index": 0, "delta": {"content": content[start:start + config.chunk_size]}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(config.chunk_delay)
+            yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def completions(request: Request):
+        body = await request.json()
+        prompts = body["prompt"] if isinstance(body["prompt"], list) else [body["prompt"]]
+        app.state.requests += 1
+        app.state.batches += 1
+
+        # One forward pass serves the whole batch
+        await asyncio.sleep(sample_latency(config.latency, rng))
+        if rng.random() < config.error_rate:
+            return JSONResponse({"error": {"message": "mock upstream error"}}, status_code=503)
+
+        choices = []
+        prompt_tokens = completion_tokens = 0
+        for idx, prompt in enumerate(prompts):
+            text = canned_completion(prompt)
+            choices.append({"index": idx, "text": text, "finish_reason": "stop"})
+            prompt_tokens += len(prompt.split())
+            completion_tokens += len(text.split())
+
+        return {
+            "model": body.get("model"),
+            "choices": choices,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/api/v1/chat/completions", chat_completions, methods=["POST"])
+    if config.batching:
+        app.add_api_route("/v1/completions", completions, methods=["POST"])
+        app.add_api_route("/api/v1/completions", completions, methods=["POST"])
+    return app
+
+
+app = create_app(MockLLMConfig.from_env())
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="fixed:0.2")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--chunk-delay", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-batching", action="store_true", help="don't serve /v1/completions")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(MockLLMConfig(
+            args.latency, args.error_rate, args.chunk_delay, seed=args.seed, batching=not args.no_batching
+        )),
+        host="0.0.0.0",
+        port=args.port
+    )
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from metrics import COALESCED_MESSAGES, REPLY_ROUNDS
+
+if TYPE_CHECKING:
+    from gd_engine import GDEngine
+
+# Human messages posted within this many seconds of each other get one round of AI replies
+REPLY_COALESCE_WINDOW = 0.25
+
+logger = logging.getLogger(__name__)
+
+
+class ReplyMailbox:
+    """Single consumer for a session's AI reply work
+
+    Human messages are committed to the transcript when they are accepted and
+    then posted here. One consumer task turns the mail into reply rounds in
+    sequence order. Messages that arrive while a round is being generated,
+    or within the coalescing window when several humans are seated, are
+    answered together in the next round instead of each triggering replies
+    of their own. The consumer only runs while there is mail and is one of
+    the engine's reply tasks, so ending or closing the session cancels it.
+    """
+
+    def __init__(self, engine: "GDEngine", coalesce_window: float = REPLY_COALESCE_WINDOW):
+        self.engine = engine
+        self.coalesce_window = coalesce_window
+        # Entries are (seq, participant, message)
+        self._mail: List[Tuple[int, str, str]] = []
+        self._consumer: Optional[asyncio.Task] = None
+
+    def post(self, seq: int, participant: str, message: str) -> asyncio.Task:
+        """Queue a committed human message for replies; returns the consumer task that will answer it"""
+        self._mail.append((seq, participant, message))
+        if self._consumer is None:
+            self._consumer = asyncio.create_task(self._consume())
+            self.engine._reply_tasks.add(self._consumer)
+            self._consumer.add_done_callback(self.engine._reply_tasks.discard)
+        return self._consumer
+
+    async def _consume(self):
+        try:
+            while self._mail:
+                # Let other humans' messages posted in quick succession join this round
+                if self.engine.human_count > 1:
+                    await asyncio.sleep(self.coalesce_window)
+                batch = sorted(self._mail)
+                self._mail = []
+
+                REPLY_ROUNDS.inc()
+                COALESCED_MESSAGES.inc(len(batch) - 1)
+                try:
+                    await self.engine._respond_to_messages(batch)
+                except Exception:
+                    # A failed round loses its replies, not the mail queued behind it
+                    logger.exception("Reply round failed in session %s", self.engine.session_id)
+        finally:
+            # Cleared before the task finishes so a later post starts a new consumer
+            self._consumer = None
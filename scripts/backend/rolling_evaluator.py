@@ -0,0 +1,168 @@
+import asyncio
+from typing import Dict, List, Optional
+from ai_agents import AnalysisAgent
+from summarizer import TranscriptSummarizer
+from transcript import ParticipantStats
+
+# A participant is re-scored once they have been quiet for DEBOUNCE seconds,
+# or MAX_DELAY seconds after their first unscored message, whichever is first
+ROLLING_DEBOUNCE = 5.0
+ROLLING_MAX_DELAY = 30.0
+
+# How long finalize() waits for evaluations that are already in flight before
+# reporting whoever is still out of date as provisional
+FINALIZE_GRACE = 0.5
+
+
+class RollingEvaluator:
+    """Keeps per-participant evaluations up to date while the discussion runs"""
+
+    def __init__(
+        self,
+        analysis_agent: AnalysisAgent,
+        participation_data: Dict[str, ParticipantStats],
+        digests: TranscriptSummarizer,
+        debounce: float = ROLLING_DEBOUNCE,
+        max_delay: float = ROLLING_MAX_DELAY
+    ):
+        self.analysis_agent = analysis_agent
+        self.participation_data = participation_data
+        self.digests = digests
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.topic: Optional[str] = None
+
+        # Latest evaluation per participant and the speaking_count it reflects
+        self.results: Dict[str, Dict] = {}
+        self.evaluated_counts: Dict[str, int] = {}
+
+        self._first_pending: Dict[str, float] = {}
+        self._last_update: Dict[str, float] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    def notify(self, name: str, topic: Optional[str]):
+        """Record a new message from name; schedules a debounced re-evaluation"""
+        if topic is None or name not in self.participation_data:
+            return
+        self.topic = topic
+
+        now = asyncio.get_running_loop().time()
+        self._last_update[name] = now
+        self._first_pending.setdefault(name, now)
+
+        if name not in self._workers:
+            self._workers[name] = asyncio.create_task(self._worker(name, topic))
+
+    def _is_stale(self, name: str) -> bool:
+        return self.evaluated_counts.get(name, 0) != self.participation_data[name].speaking_count
+
+    async def _worker(self, name: str, topic: str):
+        loop = asyncio.get_running_loop()
+
+        try:
+            while self._is_stale(name):
+                # Wait for the participant to go quiet, but not forever
+                while True:
+                    deadline = min(
+                        self._last_update[name] + self.debounce,
+                        self._first_pending[name] + self.max_delay
+                    )
+                    delay = deadline - loop.time()
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+
+                count = self.participation_data[name].speaking_count
+                self._first_pending.pop(name, None)
+                # Keep the heuristic fallback current in case this call fails
+                self.analysis_agent.score_provisional(self.participation_data, self.digests.transcript, topic)
+                result = await self.analysis_agent.evaluate_participant(
+                    name, topic, self.participation_data[name], self.digests.content(name)
+                )
+                self.results[name] = result
+                self.evaluated_counts[name] = count
+                # Messages that arrived during the call start a new pending window
+                if self._is_stale(name):
+                    self._first_pending.setdefault(name, loop.time())
+        finally:
+            self._workers.pop(name, None)
+
+    async def finalize(self, participants: List[Dict]) -> Dict:
+        """Rank the latest evaluations without waiting on new LLM calls
+
+        Participants who spoke since their last evaluation keep it, and those
+        never evaluated get heuristic scores; both are marked provisional
+        until refresh() re-evaluates them.
+        """
+        workers = list(self._workers.values())
+        if workers:
+            await asyncio.wait(workers, timeout=FINALIZE_GRACE)
+        self.close()
+        if self.topic is not None:
+            self.analysis_agent.score_provisional(self.participation_data, self.digests.transcript, self.topic)
+        return self.report(participants)
+
+    def stale_speakers(self, participants: List[Dict]) -> List[str]:
+        """Participants who spoke since their last evaluation, or were never evaluated"""
+        return [
+            participant["name"] for participant in participants
+            if participant["name"] in self.participation_data
+            and self.participation_data[participant["name"]].speaking_count
+            and self._is_stale(participant["name"])
+        ]
+
+    async def refresh(self, participants: List[Dict]) -> Optional[Dict]:
+        """Re-evaluate stale participants after finalize(); None when there was nothing to do"""
+        stale = self.stale_speakers(participants)
+        if self.topic is None or not stale:
+            return None
+
+        counts = {name: self.participation_data[name].speaking_count for name in stale}
+        results = await self.analysis_agent.evaluate_participants(
+            stale, self.participation_data, self.digests, self.topic
+        )
+        for name, result in zip(stale, results):
+            if result.get("partial"):
+                # Keep an earlier complete evaluation over a deadline placeholder
+                self.results.setdefault(name, result)
+                continue
+            self.results[name] = result
+            self.evaluated_counts[name] = counts[name]
+        return self.report(participants)
+
+    def report(self, participants: List[Dict]) -> Dict:
+        evaluations = []
+        for participant in participants:
+            name = participant["name"]
+            # Skip Admin
+            if name == "Admin":
+                continue
+
+            data = self.participation_data.get(name)
+            if data is None or not data.speaking_count:
+                evaluations.append(self.analysis_agent.no_contribution_evaluation(name))
+            elif name in self.results:
+                result = dict(self.results[name])
+                if self._is_stale(name):
+                    result["partial"] = True
+                evaluations.append(result)
+            else:
+                evaluations.append(self.analysis_agent.pending_evaluation(name))
+
+        return self.analysis_agent.rank_evaluations(evaluations)
+
+    def to_state(self) -> Dict:
+        return {"results": self.results, "evaluated_counts": self.evaluated_counts}
+
+    def load_state(self, state: Dict):
+        """Merge results saved by another process, keeping whichever covers more messages"""
+        for name, count in state["evaluated_counts"].items():
+            if count > self.evaluated_counts.get(name, 0):
+                self.results[name] = state["results"][name]
+                self.evaluated_counts[name] = count
+
+    def close(self):
+        """Cancel outstanding background evaluations"""
+        for task in list(self._workers.values()):
+            task.cancel()
+        self._workers.clear()
@@ -0,0 +1,232 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional
+from gd_engine import GDEngine
+from metrics import SESSIONS_ARCHIVED
+
+# Completed sessions are appended here as gzip JSONL segments plus an index
+ARCHIVE_DIR = os.environ.get("GD_ARCHIVE_DIR", "gd_archive")
+# A new segment is started once the current one reaches this size
+ARCHIVE_SEGMENT_BYTES = int(os.environ.get("GD_ARCHIVE_SEGMENT_BYTES", 64 * 1024 * 1024))
+READ_CHUNK_BYTES = 64 * 1024
+
+INDEX_FILE = "index.jsonl"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+
+class ArchiveEntry:
+    """Location of one archived session: a gzip member inside a segment file"""
+
+    __slots__ = ("session_id", "segment", "offset", "length")
+
+    def __init__(self, session_id: str, segment: str, offset: int, length: int):
+        self.session_id = session_id
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+
+
+def session_lines(engine: GDEngine) -> Iterator[bytes]:
+    """The session record, then one line per transcript message"""
+    record = {
+        "session_id": engine.session_id,
+        "status": engine.status,
+        "topic": engine.topic,
+        "start_time": engine.start_time.isoformat() if engine.start_time else None,
+        "archived_at": time.time(),
+        "participants": engine.participants,
+        "participation_data": {name: stats.to_dict() for name, stats in engine.participation_data.items()},
+        "evaluation": engine.evaluation
+    }
+    yield json.dumps(record).encode() + b"\n"
+    for message in engine.messages:
+        yield json.dumps(engine.messages.as_dict(message)).encode() + b"\n"
+
+
+class SessionArchive:
+    """Append-only on-disk history of completed sessions
+
+    Each session is one gzip member appended to the current segment, so a
+    segment is itself a valid .jsonl.gz file. The index maps session ids to
+    member offsets; reads seek to a member and decompress it incrementally.
+    Writes run on one background thread in archive order, and worker
+    processes sharing a directory serialize on a lock on the index file.
+    """
+
+    def __init__(self, path: str = ARCHIVE_DIR, segment_bytes: int = ARCHIVE_SEGMENT_BYTES):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.index_path = os.path.join(path, INDEX_FILE)
+
+        self.entries: Dict[str, ArchiveEntry] = {}
+        self._index_offset = 0
+        # Index refreshes run on worker threads
+        self._index_lock = threading.Lock()
+        # Sessions handed to the writer thread but not yet on disk
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gd-archive")
+        self._refresh_index()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def archive(self, engine: GDEngine):
+        """Queue a completed session for writing; the caller has already dropped it"""
+        future = asyncio.get_running_loop().run_in_executor(self._writer, self._write, engine)
+        self._pending[engine.session_id] = future
+
+        def on_written(done: asyncio.Future):
+            if self._pending.get(engine.session_id) is done:
+                del self._pending[engine.session_id]
+            if done.cancelled() or done.exception() is not None:
+                SESSIONS_ARCHIVED.inc(outcome="error")
+                return
+            entry = done.result()
+            self.entries[entry.session_id] = entry
+            SESSIONS_ARCHIVED.inc(outcome="written")
+
+        future.add_done_callback(on_written)
+
+    async def flush(self):
+        """Wait for every queued session to reach disk"""
+        if self._pending:
+            await asyncio.wait(list(self._pending.values()))
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+
+    def _segment_for_write(self) -> str:
+        segments = sorted(
+            name for name in os.listdir(self.path)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        if segments and os.path.getsize(os.path.join(self.path, segments[-1])) < self.segment_bytes:
+            return segments[-1]
+        number = int(segments[-1][len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1 if segments else 1
+        return f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+    def _write(self, engine: GDEngine) -> ArchiveEntry:
+        # wbits=31 writes a complete gzip member
+        compressor = zlib.compressobj(wbits=31)
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.index_path, "ab") as index:
+            fcntl.flock(index, fcntl.LOCK_EX)
+            try:
+                segment = self._segment_for_write()
+                with open(os.path.join(self.path, segment), "ab") as out:
+                    offset = out.tell()
+                    for line in session_lines(engine):
+                        out.write(compressor.compress(line))
+                    out.write(compressor.flush())
+                    out.flush()
+                    os.fsync(out.fileno())
+                    length = out.tell() - offset
+
+                index.write(json.dumps({
+                    "session_id": engine.session_id,
+                    "segment": segment,
+                    "offset": offset,
+                    "length": length,
+                    "topic": engine.topic,
+                    "archived_at": time.time()
+                }).encode() + b"\n")
+                index.flush()
+            finally:
+                fcntl.flock(index, fcntl.LOCK_UN)
+        return ArchiveEntry(engine.session_id, segment, offset, length)
+
+    def _refresh_index(self):
+        """Pick up index lines appended since the last read, including other workers' writes"""
+        with self._index_lock:
+            try:
+                with open(self.index_path, "rb") as index:
+                    index.seek(self._index_offset)
+                    data = index.read()
+            except FileNotFoundError:
+                return
+
+            # A line still being written has no newline yet
+            complete = data[:data.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                item = json.loads(line)
+                self.entries[item["session_id"]] = ArchiveEntry(
+                    item["session_id"], item["segment"], item["offset"], item["length"]
+                )
+            self._index_offset += len(complete)
+
+    async def find(self, session_id: str) -> Optional[ArchiveEntry]:
+        """Where session_id is archived, waiting for it if it is still being written"""
+        pending = self._pending.get(session_id)
+        if pending is not None:
+            await asyncio.wait([pending])
+
+        entry = self.entries.get(session_id)
+        if entry is None:
+            await asyncio.to_thread(self._refresh_index)
+            entry = self.entries.get(session_id)
+        return entry
+
+    def iter_chunks(self, entry: ArchiveEntry) -> Iterator[bytes]:
+        """Decompress one session a chunk at a time; every chunk ends on a line boundary"""
+        decompressor = zlib.decompressobj(wbits=31)
+        buffer = b""
+        with open(os.path.join(self.path, entry.segment), "rb") as segment:
+            segment.seek(entry.offset)
+            remaining = entry.length
+            while remaining > 0:
+                chunk = segment.read(min(READ_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                buffer += decompressor.decompress(chunk)
+                end = buffer.rfind(b"\n") + 1
+                if end:
+                    yield buffer[:end]
+                    buffer = buffer[end:]
+        if buffer:
+            yield buffer
+
+    def read_report(self, entry: ArchiveEntry) -> Dict:
+        """The session record; decompression stops after its line"""
+        chunks = self.iter_chunks(entry)
+        try:
+            return json.loads(next(chunks).split(b"\n", 1)[0])
+        finally:
+            chunks.close()
+
+    def iter_messages(self, entry: ArchiveEntry) -> Iterator[bytes]:
+        """Transcript messages as JSON lines, in chunks"""
+        chunks = self.iter_chunks(entry)
+        first = next(chunks, b"").split(b"\n", 1)
+        if len(first) > 1 and first[1]:
+            yield first[1]
+        yield from chunks
+
+    def iter_index(self) -> Iterator[bytes]:
+        """One JSON line per archived session (id, topic, archive time), read from disk in chunks"""
+        try:
+            index = open(self.index_path, "rb")
+        except FileNotFoundError:
+            return
+        with index:
+            while True:
+                lines = index.readlines(READ_CHUNK_BYTES)
+                # A line still being written has no newline yet
+                lines = [line for line in lines if line.endswith(b"\n")]
+                if not lines:
+                    return
+                yield b"".join(
+                    json.dumps({
+                        "session_id": item["session_id"],
+                        "topic": item["topic"],
+                        "archived_at": item["archived_at"]
+                    }).encode() + b"\n"
+                    for item in map(json.loads, lines)
+                )
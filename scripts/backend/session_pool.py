@@ -0,0 +1,69 @@
+import asyncio
+import os
+import uuid
+from collections import deque
+from typing import Deque, Optional, Set
+from gd_engine import GDEngine
+
+# Number of ready sessions to keep on hand (0 disables the pool)
+WARM_POOL_SIZE = int(os.environ.get("GD_WARM_POOL_SIZE", 0))
+# Sessions prepared per second while the pool is below size
+WARM_POOL_REFILL_RATE = float(os.environ.get("GD_WARM_POOL_REFILL_RATE", 2))
+# Regenerate a topic this many times if it was used recently
+TOPIC_RETRIES = 2
+
+
+class WarmSessionPool:
+    """Background-filled pool of sessions with participants seated and topic pre-generated
+
+    Only default-configured engines are pooled; take() returns None when the
+    pool is empty and the caller builds a session the slow way.
+    """
+
+    def __init__(self, size: int = WARM_POOL_SIZE, refill_rate: float = WARM_POOL_REFILL_RATE):
+        self.size = size
+        self.refill_rate = refill_rate
+        self._ready: Deque[GDEngine] = deque()
+        self._preparing: Set[asyncio.Task] = set()
+        self._filler: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+    def take(self, session_id: str) -> Optional[GDEngine]:
+        """Hand out a ready engine under the given session id"""
+        if not self._ready:
+            self.misses += 1
+            return None
+
+        engine = self._ready.popleft()
+        engine.session_id = session_id
+        self.hits += 1
+        return engine
+
+    async def _prepare_one(self):
+        engine = GDEngine(f"pool-{uuid.uuid4()}")
+        engine.seat_default_participants()
+        await engine.prepare(topic_retries=TOPIC_RETRIES)
+        self._ready.append(engine)
+
+    async def _fill_forever(self):
+        while True:
+            if len(self._ready) + len(self._preparing) < self.size:
+                task = asyncio.create_task(self._prepare_one())
+                self._preparing.add(task)
+                task.add_done_callback(self._preparing.discard)
+            await asyncio.sleep(1 / self.refill_rate)
+
+    async def start(self):
+        if self.size > 0 and self._filler is None:
+            self._filler = asyncio.create_task(self._fill_forever())
+
+    async def stop(self):
+        if self._filler is not None:
+            self._filler.cancel()
+            self._filler = None
+        for task in list(self._preparing):
+            task.cancel()
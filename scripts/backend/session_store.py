@@ -0,0 +1,466 @@
+import asyncio
+import fcntl
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from gd_engine import GDEngine
+
+# Sessions untouched for this long are reaped
+SESSION_IDLE_TTL = 30 * 60
+# Completed sessions are archived and dropped once untouched for this long
+COMPLETED_SESSION_TTL = 5 * 60
+# Upper bound on live sessions held by one process
+MAX_SESSIONS = 1000
+REAP_INTERVAL = 60
+
+# Shared SQLite backend (GD_SESSION_BACKEND=sqlite) for running several workers
+SESSION_DB_PATH = os.environ.get("GD_SESSION_DB", "gd_sessions.db")
+# How often sessions with live subscribers pick up changes made by other workers
+SYNC_INTERVAL = 0.5
+LOCK_POLL_INTERVAL = 0.01
+
+
+class SessionCapacityError(Exception):
+    """Raised when the store is full and no completed session can be evicted"""
+    pass
+
+
+class SessionStore(ABC):
+    """Where GDEngine instances live between requests"""
+
+    @abstractmethod
+    async def add(self, engine: GDEngine):
+        pass
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[GDEngine]:
+        pass
+
+    @abstractmethod
+    async def remove(self, session_id: str) -> Optional[GDEngine]:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def loaded(self) -> List[GDEngine]:
+        """Engines currently held in this process's memory"""
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __getitem__(self, session_id: str) -> GDEngine:
+        engine = self.get(session_id)
+        if engine is None:
+            raise KeyError(session_id)
+        return engine
+
+    @asynccontextmanager
+    async def transaction(self, session_id: str) -> AsyncIterator[Optional[GDEngine]]:
+        """Exclusive access to a session for a batch of changes; yields None if it doesn't exist"""
+        engine = self.get(session_id)
+        if engine is None:
+            yield None
+            return
+        async with engine.transaction():
+            yield engine
+
+    async def start(self):
+        """Start background maintenance"""
+        pass
+
+    async def stop(self):
+        """Stop background maintenance"""
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store with idle-TTL reaping and an LRU cap on completed sessions
+
+    on_evict is called with every completed session dropped by the reaper or
+    the cap, so it can be archived instead of lost.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float = SESSION_IDLE_TTL,
+        max_sessions: int = MAX_SESSIONS,
+        reap_interval: float = REAP_INTERVAL,
+        on_evict: Optional[Callable[[GDEngine], None]] = None,
+        completed_ttl: float = COMPLETED_SESSION_TTL
+    ):
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.max_sessions = max_sessions
+        self.reap_interval = reap_interval
+        self.on_evict = on_evict
+
+        # Least recently used first
+        self._sessions: "OrderedDict[str, GDEngine]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def loaded(self) -> List[GDEngine]:
+        return list(self._sessions.values())
+
+    def __contains__(self, session_id: str) -> bool:
+        # Membership checks don't count as activity
+        return session_id in self._sessions
+
+    async def add(self, engine: GDEngine):
+        if engine.session_id in self._sessions:
+            raise ValueError(f"Session {engine.session_id} already exists")
+        if len(self._sessions) >= self.max_sessions:
+            if not await self._evict_completed():
+                raise SessionCapacityError("Too many active sessions")
+
+        self._sessions[engine.session_id] = engine
+        self._touch(engine.session_id)
+
+    def get(self, session_id: str) -> Optional[GDEngine]:
+        engine = self._sessions.get(session_id)
+        if engine is not None:
+            self._touch(session_id)
+        return engine
+
+    async def remove(self, session_id: str) -> Optional[GDEngine]:
+        engine = self._sessions.get(session_id)
+        if engine is None:
+            return None
+        # Closing cancels an evaluation still running; let it be committed first
+        await engine.wait_for_evaluation()
+        if self._sessions.get(session_id) is not engine:
+            # Removed by a concurrent caller while waiting
+            return None
+        del self._sessions[session_id]
+        self._last_access.pop(session_id, None)
+        engine.close()
+        return engine
+
+    def _touch(self, session_id: str):
+        self._last_access[session_id] = time.monotonic()
+        self._sessions.move_to_end(session_id)
+
+    async def _evict(self, session_id: str):
+        engine = await self.remove(session_id)
+        if engine is not None and engine.status == "completed" and self.on_evict is not None:
+            self.on_evict(engine)
+
+    async def _evict_completed(self) -> bool:
+        """Evict the least recently used completed session that isn't still being evaluated, if any"""
+        for session_id, engine in self._sessions.items():
+            if engine.status == "completed" and not engine.evaluating:
+                await self._evict(session_id)
+                return True
+        return False
+
+    async def reap(self) -> int:
+        """Evict sessions idle for longer than idle_ttl, or completed_ttl once completed; returns how many were dropped"""
+        now = time.monotonic()
+        expired = [
+            session_id for session_id, engine in self._sessions.items()
+            if self._last_access[session_id] < now - (self.completed_ttl if engine.status == "completed" else self.idle_ttl)
+            and engine.events.subscriber_count == 0
+            and not engine.evaluating
+        ]
+        for session_id in expired:
+            await self._evict(session_id)
+        return len(expired)
+
+    async def _reap_forever(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            await self.reap()
+
+    async def start(self):
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def stop(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session state shared between worker processes through a SQLite database
+
+    Each worker keeps a cached GDEngine per session and reloads it when the
+    stored version is newer. Changes go through transaction(), which holds a
+    per-session file lock across processes, refreshes the engine, and writes
+    back session metadata plus any new transcript rows on exit.
+
+    Writes run on one dedicated thread with its own connection, so a write
+    waiting out busy_timeout behind another worker doesn't stall the event
+    loop. Reads stay on the loop: in WAL mode they never wait for writers.
+    """
+
+    def __init__(
+        self,
+        path: str = SESSION_DB_PATH,
+        idle_ttl: float = SESSION_IDLE_TTL,
+        max_sessions: int = MAX_SESSIONS,
+        reap_interval: float = REAP_INTERVAL,
+        on_evict: Optional[Callable[[GDEngine], None]] = None,
+        completed_ttl: float = COMPLETED_SESSION_TTL
+    ):
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.max_sessions = max_sessions
+        self.reap_interval = reap_interval
+        self.on_evict = on_evict
+        self.lock_dir = f"{path}.locks"
+        os.makedirs(self.lock_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            state TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )""")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS messages (
+            session_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            participant TEXT NOT NULL,
+            message TEXT NOT NULL,
+            time REAL NOT NULL,
+            PRIMARY KEY (session_id, seq)
+        )""")
+
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gd-session-db")
+        self._write_conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._write_conn.execute("PRAGMA busy_timeout=5000")
+
+        self._engines: Dict[str, GDEngine] = {}
+        # Transcript rows already in the database, per cached engine
+        self._saved_seq: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def loaded(self) -> List[GDEngine]:
+        return list(self._engines.values())
+
+    def _attach(self, engine: GDEngine):
+        engine.transaction_factory = lambda: self._transaction(engine.session_id)
+        self._engines[engine.session_id] = engine
+
+    def _load_messages(self, session_id: str, after_seq: int) -> List[Tuple[str, str, float]]:
+        return self._conn.execute(
+            "SELECT participant, message, time FROM messages "
+            "WHERE session_id = ? AND seq > ? ORDER BY seq",
+            (session_id, after_seq)
+        ).fetchall()
+
+    async def _write(self, write: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._writer, write, *args)
+
+    def _changes(self, engine: GDEngine) -> Tuple[List[Tuple], Tuple]:
+        """Rows and session values to write, taken on the loop so the engine isn't read from another thread"""
+        records = engine.messages.records[self._saved_seq.get(engine.session_id, 0):]
+        rows = [
+            (engine.session_id, msg.seq, engine.messages.speakers[msg.speaker], msg.text, msg.time)
+            for msg in records
+        ]
+        values = (engine.version, engine.status, json.dumps(engine.to_state()), time.time(), engine.session_id)
+        return rows, values
+
+    async def _save(self, engine: GDEngine):
+        rows, values = self._changes(engine)
+        await self._write(self._write_changes, rows, values)
+        if rows:
+            self._saved_seq[engine.session_id] = max(self._saved_seq.get(engine.session_id, 0), rows[-1][1])
+
+    def _write_changes(self, rows: List[Tuple], values: Tuple):
+        with self._write_conn:
+            self._write_conn.execute("BEGIN")
+            self._write_conn.executemany(
+                "INSERT OR IGNORE INTO messages (session_id, seq, participant, message, time) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._write_conn.execute(
+                "UPDATE sessions SET version = ?, status = ?, state = ?, updated_at = ? WHERE session_id = ?",
+                values
+            )
+
+    def _write_insert(self, session_id: str, status: str) -> bool:
+        try:
+            self._write_conn.execute(
+                "INSERT INTO sessions (session_id, version, status, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, -1, status, "{}", time.time())
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def _write_delete(self, session_id: str) -> int:
+        with self._write_conn:
+            self._write_conn.execute("BEGIN")
+            claimed = self._write_conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+            self._write_conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        return claimed
+
+    async def add(self, engine: GDEngine):
+        if len(self) >= self.max_sessions and not await self._evict_completed():
+            raise SessionCapacityError("Too many active sessions")
+
+        if not await self._write(self._write_insert, engine.session_id, engine.status):
+            raise ValueError(f"Session {engine.session_id} already exists")
+        await self._save(engine)
+        self._attach(engine)
+
+    def get(self, session_id: str) -> Optional[GDEngine]:
+        """Return the cached engine, reloading it if another worker changed the session"""
+        row = self._conn.execute(
+            "SELECT version, state FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        engine = self._engines.get(session_id)
+
+        if row is None:
+            # Deleted by another worker
+            if engine is not None:
+                del self._engines[session_id]
+                self._saved_seq.pop(session_id, None)
+                engine.close()
+            return None
+
+        version, state = row
+        if engine is None:
+            state = json.loads(state)
+            engine = GDEngine.from_state(state, self._load_messages(session_id, 0))
+            self._attach(engine)
+            self._saved_seq[session_id] = len(engine.messages)
+        elif version > engine.version:
+            engine.load_state(json.loads(state), self._load_messages(session_id, len(engine.messages)))
+            self._saved_seq[session_id] = len(engine.messages)
+            engine.events.resync()
+        return engine
+
+    async def remove(self, session_id: str) -> Optional[GDEngine]:
+        """Delete the session; returns its engine only to the worker whose delete claimed the row"""
+        engine = self.get(session_id)
+        if engine is not None:
+            # Closing cancels an evaluation still running here; let it be committed first
+            await engine.wait_for_evaluation()
+        claimed = await self._write(self._write_delete, session_id)
+        self._engines.pop(session_id, None)
+        self._saved_seq.pop(session_id, None)
+        self._locks.pop(session_id, None)
+        try:
+            os.remove(os.path.join(self.lock_dir, session_id))
+        except FileNotFoundError:
+            pass
+        if engine is not None:
+            engine.close()
+        # Another worker reaping or deleting the same session got there first
+        return engine if claimed else None
+
+    async def _acquire_file_lock(self, session_id: str) -> int:
+        fd = os.open(os.path.join(self.lock_dir, session_id), os.O_CREAT | os.O_RDWR)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    await asyncio.sleep(LOCK_POLL_INTERVAL)
+        except BaseException:
+            # Cancelled while waiting: the caller never gets the descriptor to close
+            os.close(fd)
+            raise
+
+    @asynccontextmanager
+    async def _transaction(self, session_id: str) -> AsyncIterator[Optional[GDEngine]]:
+        # In-process lock first so local coroutines don't spin on the file lock
+        async with self._locks.setdefault(session_id, asyncio.Lock()):
+            fd = await self._acquire_file_lock(session_id)
+            try:
+                engine = self.get(session_id) or self._engines.get(session_id)
+                version = engine.version if engine is not None else None
+                yield engine
+                if engine is not None and engine.version != version:
+                    await self._save(engine)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    async def _evict(self, session_id: str):
+        engine = await self.remove(session_id)
+        if engine is not None and engine.status == "completed" and self.on_evict is not None:
+            self.on_evict(engine)
+
+    async def _evict_completed(self) -> bool:
+        """Evict the least recently updated completed session that isn't still being evaluated here, if any"""
+        rows = self._conn.execute(
+            "SELECT session_id FROM sessions WHERE status = 'completed' ORDER BY updated_at"
+        ).fetchall()
+        for (session_id,) in rows:
+            if session_id not in self._engines or not self._engines[session_id].evaluating:
+                await self._evict(session_id)
+                return True
+        return False
+
+    async def reap(self) -> int:
+        """Evict sessions not updated by any worker for longer than idle_ttl, or completed_ttl once completed"""
+        now = time.time()
+        expired = [
+            session_id for (session_id,) in self._conn.execute(
+                "SELECT session_id FROM sessions WHERE updated_at < ? OR (status = 'completed' AND updated_at < ?)",
+                (now - self.idle_ttl, now - self.completed_ttl)
+            ).fetchall()
+            if session_id not in self._engines
+            or (self._engines[session_id].events.subscriber_count == 0 and not self._engines[session_id].evaluating)
+        ]
+        for session_id in expired:
+            await self._evict(session_id)
+        return len(expired)
+
+    async def _reap_forever(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            await self.reap()
+
+    async def _sync_forever(self):
+        # Push changes made by other workers to this worker's subscribers
+        while True:
+            await asyncio.sleep(SYNC_INTERVAL)
+            for session_id, engine in list(self._engines.items()):
+                if engine.events.subscriber_count:
+                    self.get(session_id)
+
+    async def start(self):
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._reap_forever()),
+                asyncio.create_task(self._sync_forever())
+            ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+
+def create_session_store(on_evict: Optional[Callable[[GDEngine], None]] = None) -> SessionStore:
+    """Build the store selected by GD_SESSION_BACKEND (memory or sqlite)"""
+    if os.environ.get("GD_SESSION_BACKEND", "memory") == "sqlite":
+        return SQLiteSessionStore(on_evict=on_evict)
+    return InMemorySessionStore(on_evict=on_evict)
@@ -0,0 +1,188 @@
+"""Headless simulation: AI-only group discussions driven directly through GDEngine.
+
+Usage:
+    python simulate.py [--sessions 100] [--workers 4] [--concurrency 25] [--duration 600]
+                       [--out sim_dataset] [--latency lognormal:0.8,0.5] [--error-rate 0.0]
+                       [--llm-url URL] [--group-size 5] [--turn-interval 8] [--batch-window MS]
+                       [--rolling] [--seed 0]
+
+Every seat is an AI candidate; candidates take turns through TurnScheduler
+and the session is scored by AnalysisAgent when it ends, exactly as in the
+API. Sessions are split across a process pool, and each worker runs its
+share concurrently on one event loop.
+
+With the in-process mock LLM the loop runs on virtual time: sleeps, pacing,
+debounces and LLM latency advance the loop clock without waiting, so
+discussions run as fast as the CPU allows. --llm-url uses a real endpoint and
+therefore wall-clock time.
+
+Each worker streams one JSON line per finished session (transcript, LLM
+evaluation and heuristic scores) to OUT/shard-NNN.jsonl.gz.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Optional
+import httpx
+from gd_engine import GDEngine, GROUP_SIZE
+from llm_batcher import LLMBatcher, set_llm_batcher
+from llm_client import LLMClient, set_llm_client
+from llm_scheduler import LLMScheduler, set_llm_scheduler
+from mock_llm_server import MockLLMConfig, create_app
+from turn_scheduler import AUTONOMOUS_TURN_INTERVAL, TurnScheduler
+from virtual_time import VirtualTimeLoop
+
+
+def session_record(engine: GDEngine, evaluation: Dict) -> Dict:
+    """One dataset line: transcript with offsets from the start, LLM and heuristic evaluations"""
+    started = engine.start_time.timestamp()
+    personalities = {agent.name: agent.personality for agent in engine.candidate_agents}
+    return {
+        "session_id": engine.session_id,
+        "topic": engine.topic,
+        "duration_s": engine.get_elapsed_time(),
+        "participants": [
+            dict(participant, personality=personalities.get(participant["name"]))
+            for participant in engine.participants
+        ],
+        "messages": [
+            dict(engine.messages.as_dict(message), offset_s=round(message.time - started, 3))
+            for message in engine.messages
+        ],
+        "participation_data": {name: stats.to_dict() for name, stats in engine.participation_data.items()},
+        "evaluation": evaluation,
+        "heuristic_evaluation": engine.provisional_evaluation()
+    }
+
+
+async def simulate_session(session_id: str, args: argparse.Namespace) -> Dict:
+    loop = asyncio.get_running_loop()
+    # Virtual loop time starts at 0; anchor it to the real start of the run
+    epoch = time.time() - loop.time()
+
+    engine = GDEngine(session_id, rolling_evaluation=args.rolling)
+    engine.clock = lambda: epoch + loop.time()
+    # The time-up warning lands where it would in a real session of this length
+    engine.time_limit = args.duration
+    # Keep the group at --group-size for the whole run
+    engine.injection_at = None
+    engine.seat_participants([], group_size=args.group_size)
+    try:
+        await engine.start_discussion()
+        # No humans to hand the floor back to, so unprompted turns never pause
+        engine.turn_scheduler = TurnScheduler(engine, interval=args.turn_interval, max_unprompted_turns=sys.maxsize)
+        engine.turn_scheduler.start()
+        await asyncio.sleep(args.duration)
+        # The time limit may be ending it at this very moment; both calls share one evaluation
+        result = await engine.end_discussion()
+        return session_record(engine, result["evaluation"])
+    finally:
+        engine.close()
+
+
+async def run_shard_async(shard: int, sessions: int, args: argparse.Namespace) -> Dict:
+    llm_transport = None
+    mock_app = None
+    if args.llm_url is None:
+        mock_app = create_app(MockLLMConfig(latency=args.latency, error_rate=args.error_rate, seed=args.seed + shard))
+        llm_transport = httpx.ASGITransport(app=mock_app)
+    set_llm_client(LLMClient(api_url=args.llm_url or "http://mock-llm/v1/chat/completions", transport=llm_transport))
+    set_llm_batcher(LLMBatcher(window_ms=args.batch_window))
+    if args.llm_url is None:
+        # The mock has no quota to respect, and the token bucket refills on wall-clock time
+        set_llm_scheduler(LLMScheduler(rate=0))
+
+    limit = asyncio.Semaphore(args.concurrency)
+    path = os.path.join(args.out, f"shard-{shard:03d}.jsonl.gz")
+    messages = errors = 0
+
+    async def one(idx: int) -> Optional[Dict]:
+        async with limit:
+            session_id = f"sim-{args.seed}-{shard}-{idx}"
+            try:
+                return await simulate_session(session_id, args)
+            except Exception:
+                print(f"session {session_id} failed:", file=sys.stderr)
+                traceback.print_exc()
+                return None
+
+    started = time.perf_counter()
+    with gzip.open(path, "wt", encoding="utf-8") as out:
+        # Lines are written as sessions finish, not in index order
+        for task in asyncio.as_completed([one(idx) for idx in range(sessions)]):
+            record = await task
+            if record is None:
+                errors += 1
+                continue
+            messages += len(record["messages"])
+            out.write(json.dumps(record) + "\n")
+
+    return {
+        "shard": shard,
+        "path": path,
+        "sessions": sessions - errors,
+        "errors": errors,
+        "messages": messages,
+        "llm_requests": mock_app.state.requests if mock_app is not None else None,
+        "elapsed_s": time.perf_counter() - started,
+        "simulated_s": asyncio.get_running_loop().time()
+    }
+
+
+def run_shard(shard: int, sessions: int, args: argparse.Namespace) -> Dict:
+    """Process pool entry point: one event loop running a share of the sessions"""
+    random.seed(args.seed * 1000 + shard)
+    # Real endpoints need real time; see VirtualTimeLoop
+    loop_factory = VirtualTimeLoop if args.llm_url is None else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(run_shard_async(shard, sessions, args))
+
+
+def main(args: argparse.Namespace):
+    os.makedirs(args.out, exist_ok=True)
+    workers = max(1, min(args.workers, args.sessions))
+    shares = [args.sessions // workers + (1 if shard < args.sessions % workers else 0) for shard in range(workers)]
+
+    started = time.perf_counter()
+    totals = {"sessions": 0, "errors": 0, "messages": 0}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_shard, shard, share, args) for shard, share in enumerate(shares)]
+        for future in as_completed(futures):
+            report = future.result()
+            for key in totals:
+                totals[key] += report[key]
+            print(
+                f"shard {report['shard']:>3}: {report['sessions']} sessions, {report['errors']} errors, "
+                f"{report['messages']} messages in {report['elapsed_s']:.1f}s -> {report['path']}"
+            )
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"{totals['sessions']} sessions ({totals['errors']} failed), {totals['messages']} messages "
+        f"in {elapsed:.1f}s: {totals['sessions'] / elapsed:.1f} sessions/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="simulation processes")
+    parser.add_argument("--concurrency", type=int, default=25, help="sessions running at once per worker")
+    parser.add_argument("--duration", type=float, default=600, help="discussion length in (virtual) seconds")
+    parser.add_argument("--out", default="sim_dataset", help="directory for the shard files")
+    parser.add_argument("--latency", default="lognormal:0.8,0.5", help="mock LLM latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock LLM error rate")
+    parser.add_argument("--llm-url", help="use a running LLM endpoint (wall-clock time) instead of the in-process mock")
+    parser.add_argument("--group-size", type=int, default=GROUP_SIZE, help="AI candidates per discussion")
+    parser.add_argument("--turn-interval", type=float, default=AUTONOMOUS_TURN_INTERVAL, help="mean seconds between turns")
+    parser.add_argument("--batch-window", type=float, default=0, help="LLM micro-batching window in ms (0 disables)")
+    parser.add_argument("--rolling", action="store_true", help="also score participants while the discussion runs")
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
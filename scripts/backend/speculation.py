@@ -0,0 +1,121 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from ai_agents import CandidateAgent
+
+# Messages of context a speculative reply builds on
+SPECULATION_CONTEXT = 5
+# Unused speculation older than this is discarded
+SPECULATION_TTL = 30.0
+
+
+class SpeculationStats:
+    """Process-wide counters for tuning speculative replies"""
+
+    def __init__(self):
+        self.launched = 0        # speculative replies started
+        self.hits = 0            # human messages answered from speculation
+        self.misses = 0          # speculation existed but was stale
+        self.uncovered = 0       # human messages with no speculation at all
+        self.wasted = 0          # speculative replies cancelled or never used
+
+    def to_dict(self) -> Dict:
+        claimed = self.hits + self.misses + self.uncovered
+        return {
+            "launched": self.launched,
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncovered": self.uncovered,
+            "wasted": self.wasted,
+            "hit_rate": self.hits / claimed if claimed else 0.0,
+            "waste_rate": self.wasted / self.launched if self.launched else 0.0
+        }
+
+
+speculation_stats = SpeculationStats()
+
+
+def normalize_draft(text: str) -> str:
+    """Drafts match the sent message regardless of case and spacing"""
+    return " ".join(text.split()).casefold()
+
+
+class SpeculativeResponder:
+    """Pre-generates candidate replies while a human is typing
+
+    Speculation answers the draft the client sends with its typing signal and
+    is keyed to that draft and the transcript position it was built on. When
+    the human's message arrives right after that position with the same text,
+    the replies are reused; otherwise they are cancelled as stale.
+    """
+
+    def __init__(self, engine, ttl: float = SPECULATION_TTL):
+        self.engine = engine
+        self.ttl = ttl
+        self._base_seq: Optional[int] = None
+        self._draft: Optional[str] = None
+        self._started_at = 0.0
+        self._tasks: List[Tuple[CandidateAgent, asyncio.Task]] = []
+
+    def _is_current(self, base_seq: int, draft: str) -> bool:
+        return (
+            bool(self._tasks)
+            and self._base_seq == base_seq
+            and self._draft == normalize_draft(draft)
+            and time.monotonic() - self._started_at < self.ttl
+        )
+
+    def on_typing(self, draft: Optional[str]) -> bool:
+        """Start speculating on replies to draft; returns whether speculation is running
+
+        Without a draft there is nothing to answer yet, so nothing is started.
+        """
+        engine = self.engine
+        if engine.status != "in_progress" or not engine.candidate_agents or not draft or not draft.strip():
+            return False
+        if self._is_current(engine.message_seq, draft):
+            return True
+
+        self._discard()
+        context = engine.messages.recent(SPECULATION_CONTEXT)
+
+        self._base_seq = engine.message_seq
+        self._draft = normalize_draft(draft)
+        self._started_at = time.monotonic()
+        self._tasks = [
+            (agent, asyncio.create_task(agent.generate_response(
+                topic=engine.topic,
+                discussion_context=context,
+                human_input=draft
+            )))
+            for agent in engine.select_responders()
+        ]
+        speculation_stats.launched += len(self._tasks)
+        return True
+
+    async def claim(self, base_seq: int, message: str) -> Optional[List[Dict]]:
+        """Replies speculated on message at transcript position base_seq, or None if there are none usable"""
+        if not self._tasks:
+            speculation_stats.uncovered += 1
+            return None
+        if not self._is_current(base_seq, message):
+            speculation_stats.misses += 1
+            self._discard()
+            return None
+
+        tasks, self._tasks = self._tasks, []
+        speculation_stats.hits += 1
+        replies = await asyncio.gather(*[task for _, task in tasks])
+        return [
+            {"participant": agent.name, "message": reply}
+            for (agent, _), reply in zip(tasks, replies)
+        ]
+
+    def _discard(self):
+        for _, task in self._tasks:
+            task.cancel()
+        speculation_stats.wasted += len(self._tasks)
+        self._tasks = []
+
+    def close(self):
+        self._discard()
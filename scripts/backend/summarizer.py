@@ -0,0 +1,136 @@
+import asyncio
+import re
+import time
+from typing import Dict, List, Optional
+from llm_client import MODEL
+from llm_policy import get_llm_policy
+from metrics import LLM_FALLBACKS, record_llm_call
+from transcript import Transcript
+
+# Upper bound on a participant's rolling digest, in words
+DIGEST_MAX_WORDS = 200
+# Unsummarized words that trigger folding the tail into the digest; also the
+# most verbatim tail an evaluation prompt ever carries
+CHUNK_WORDS = 250
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def last_words(text: str, count: int) -> str:
+    words = text.split()
+    return " ".join(words[-count:]) if len(words) > count else text
+
+
+class ParticipantDigest:
+    """Rolling summary of everything one participant said before summarized_count"""
+
+    __slots__ = ("summary", "summarized_count")
+
+    def __init__(self, summary: str = "", summarized_count: int = 0):
+        self.summary = summary
+        self.summarized_count = summarized_count
+
+
+class TranscriptSummarizer:
+    """Keeps a bounded digest of each participant's contributions as they speak
+
+    Evaluation content is the digest plus the participant's messages since
+    it was last updated, capped at chunk_words, so prompts stay a fixed size
+    however long the discussion runs.
+    """
+
+    def __init__(self, transcript: Transcript, max_words: int = DIGEST_MAX_WORDS, chunk_words: int = CHUNK_WORDS):
+        self.transcript = transcript
+        self.max_words = max_words
+        self.chunk_words = chunk_words
+        self.digests: Dict[str, ParticipantDigest] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    def _digest(self, name: str) -> ParticipantDigest:
+        digest = self.digests.get(name)
+        if digest is None:
+            digest = self.digests[name] = ParticipantDigest()
+        return digest
+
+    def _tail(self, name: str) -> List[str]:
+        return self.transcript.texts_by(name)[self._digest(name).summarized_count:]
+
+    def notify(self, name: str, topic: Optional[str]):
+        """Record a new message from name; folds the tail into the digest once it is long enough"""
+        if name in self._workers:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop to fold on (e.g. bench_memory); the tail stays until the next notify
+            return
+        if sum(len(text.split()) for text in self._tail(name)) >= self.chunk_words:
+            self._workers[name] = asyncio.create_task(self._fold(name, topic))
+
+    def content(self, name: str) -> str:
+        """Bounded text describing what name has contributed, for evaluation prompts"""
+        summary = self._digest(name).summary
+        tail = last_words(" ".join(self._tail(name)), self.chunk_words)
+        if summary and tail:
+            return f"Summary of earlier points: {summary}\nRecent messages: {tail}"
+        return summary or tail or "No contribution"
+
+    async def _fold(self, name: str, topic: Optional[str]):
+        try:
+            digest = self._digest(name)
+            texts = self._tail(name)
+            summary = await self._summarize(name, topic, digest.summary, texts)
+            # Only this task advances the digest, so the snapshot above is still current
+            digest.summary = summary
+            digest.summarized_count += len(texts)
+        finally:
+            self._workers.pop(name, None)
+
+    async def _summarize(self, name: str, topic: Optional[str], previous: str, texts: List[str]) -> str:
+        prompt = f"""You maintain a running summary of one participant's contributions to a group discussion.
+
+Topic: {topic}
+Participant: {name}
+Summary so far: {previous or "None"}
+New messages: {" ".join(texts)}
+
+Rewrite the summary to cover both the summary so far and the new messages in at most {self.max_words} words.
+Keep their main arguments, examples, stance changes and how they engaged with others. Return only the summary text."""
+
+        started = time.perf_counter()
+        content = await get_llm_policy().complete(
+            "summary",
+            prompt,
+            model=MODEL,
+            temperature=0.2,
+            max_tokens=self.max_words * 2
+        )
+        record_llm_call("summarizer", started, content)
+
+        if content is None or not content.strip():
+            LLM_FALLBACKS.inc(agent="summarizer", reason="error")
+            return self._extractive_summary(previous, texts)
+        # Models overshoot word limits; the bound is what keeps prompts fixed-size
+        return " ".join(content.split()[:self.max_words])
+
+    def _extractive_summary(self, previous: str, texts: List[str]) -> str:
+        """Fallback digest: the first sentence of each new message after the previous digest"""
+        leads = [SENTENCE_END.split(text.strip(), 1)[0] for text in texts if text.strip()]
+        return last_words(" ".join([previous] + leads).strip(), self.max_words)
+
+    def to_state(self) -> Dict:
+        return {
+            name: {"summary": digest.summary, "summarized_count": digest.summarized_count}
+            for name, digest in self.digests.items()
+        }
+
+    def load_state(self, state: Dict):
+        """Merge digests saved by another process, keeping whichever covers more messages"""
+        for name, data in state.items():
+            if data["summarized_count"] > self._digest(name).summarized_count:
+                self.digests[name] = ParticipantDigest(data["summary"], data["summarized_count"])
+
+    def close(self):
+        for task in list(self._workers.values()):
+            task.cancel()
+        self._workers.clear()
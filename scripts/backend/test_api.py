@@ -0,0 +1,88 @@
+"""HTTP and WebSocket contract tests against the in-process mock LLM: python -m pytest test_api.py"""
+import time
+from datetime import datetime
+import httpx
+import pytest
+from starlette.testclient import TestClient
+import gd_engine
+import main
+from llm_client import LLMClient, set_llm_client
+from llm_scheduler import LLMScheduler, set_llm_scheduler
+from mock_llm_server import MockLLMConfig, create_app
+
+REPLY_WAIT = 10.0
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = create_app(MockLLMConfig(latency="fixed:0.05"))
+    set_llm_client(LLMClient(api_url="http://mock-llm/v1/chat/completions", transport=httpx.ASGITransport(app=app)))
+    set_llm_scheduler(LLMScheduler(rate=0))
+    # Replies are paced 1-3s apart for realism; no need to wait for that here
+    monkeypatch.setattr(gd_engine, "REPLY_PACING", (0.0, 0.0))
+    with TestClient(main.app) as client:
+        yield client
+
+
+def started_session(client: TestClient) -> str:
+    session_id = client.post("/api/session/create", json={}).json()["session_id"]
+    assert client.post("/api/session/start", params={"session_id": session_id}).status_code == 200
+    return session_id
+
+
+def send(client: TestClient, session_id: str, text: str) -> dict:
+    response = client.post("/api/message/send", json={
+        "session_id": session_id,
+        "participant": "YOU",
+        "message": text,
+        "timestamp": datetime.now().isoformat()
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_send_returns_before_replies_and_status_polling_delivers_them(client):
+    session_id = started_session(client)
+    cursor = client.get(f"/api/session/{session_id}/status").json()["cursor"]
+
+    body = send(client, session_id, "Automation creates new kinds of jobs")
+    assert body["status"] == "success"
+    assert body["ai_responses"] == []
+    assert body["ai_responses_pending"] is True
+
+    deadline = time.monotonic() + REPLY_WAIT
+    replies = []
+    while not replies and time.monotonic() < deadline:
+        status = client.get(f"/api/session/{session_id}/status", params={"since": cursor}).json()
+        replies = [msg for msg in status["messages"] if msg["participant"].startswith("Candidate")]
+        time.sleep(0.05)
+
+    assert replies, "no candidate reply reached status polling"
+    # Replies come after the human message they answer
+    participants = [msg["participant"] for msg in status["messages"]]
+    assert participants[0] == "YOU"
+
+
+def test_websocket_delivers_the_message_then_the_replies(client):
+    session_id = started_session(client)
+
+    with client.websocket_connect(f"/ws/session/{session_id}") as socket:
+        snapshot = socket.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["data"]["status"] == "in_progress"
+
+        body = send(client, session_id, "Retraining has to be funded publicly")
+        assert body["ai_responses"] == [] and body["ai_responses_pending"] is True
+
+        appended = []
+        last_seq = snapshot["data"]["version"]
+        while not any(msg["participant"].startswith("Candidate") for msg in appended):
+            event = socket.receive_json()
+            # Sequence numbers only move forward after the snapshot
+            assert event["seq"] > last_seq
+            last_seq = event["seq"]
+            if event["type"] == "message_appended":
+                appended.append(event["data"])
+
+    assert appended[0]["participant"] == "YOU"
+    assert appended[0]["message"] == "Retraining has to be funded publicly"
@@ -0,0 +1,50 @@
+"""LLM client tests against an httpx mock transport: python -m pytest test_llm_client.py"""
+import asyncio
+import json
+import httpx
+from llm_client import CONNECT_TIMEOUT, DEFAULT_DEADLINE, LLMClient
+
+COMPLETION = {"choices": [{"message": {"content": "ok"}}]}
+STREAM = b'data: {"choices": [{"delta": {"content": "ok"}}]}\n\ndata: [DONE]\n\n'
+
+
+def recording_client(seen):
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.extensions["timeout"])
+        if json.loads(request.content).get("stream"):
+            return httpx.Response(200, content=STREAM, headers={"Content-Type": "text/event-stream"})
+        return httpx.Response(200, json=COMPLETION)
+
+    return LLMClient(api_url="http://mock-llm/v1/chat/completions", transport=httpx.MockTransport(handler))
+
+
+def test_caller_deadline_bounds_the_read_timeout():
+    async def scenario():
+        seen = []
+        client = recording_client(seen)
+        deadline = DEFAULT_DEADLINE * 3
+        assert await client.complete("hi", deadline=deadline) == "ok"
+        assert await client.complete("hi", deadline=deadline, on_delta=lambda delta: None) == "ok"
+        response = await client.post("http://mock-llm/v1/completions", {"prompt": ["hi"]}, deadline=deadline)
+        assert response.status_code == 200
+        await client.aclose()
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert len(seen) == 3
+    for timeout in seen:
+        assert timeout["read"] == DEFAULT_DEADLINE * 3
+        assert timeout["connect"] == CONNECT_TIMEOUT
+
+
+def test_short_deadline_also_caps_the_connect_timeout():
+    async def scenario():
+        seen = []
+        client = recording_client(seen)
+        await client.complete("hi", deadline=2.0)
+        await client.aclose()
+        return seen
+
+    [timeout] = asyncio.run(scenario())
+    assert timeout["read"] == 2.0
+    assert timeout["connect"] == 2.0
@@ -0,0 +1,46 @@
+"""LLM policy hedging tests, run on virtual time: python -m pytest test_llm_policy.py"""
+import asyncio
+import httpx
+from llm_client import LLMClient, set_llm_client
+from llm_policy import HEDGE_MIN_SAMPLES, LatencyTracker, LLMPolicy
+from llm_scheduler import LLMScheduler, set_llm_scheduler
+from metrics import LLM_HEDGES_FIRED, LLM_SHED
+from mock_llm_server import MockLLMConfig, create_app
+from virtual_time import run_virtual
+
+
+def use_mock_llm(latency: str):
+    app = create_app(MockLLMConfig(latency=latency))
+    set_llm_client(LLMClient(api_url="http://mock-llm/v1/chat/completions", transport=httpx.ASGITransport(app=app)))
+    set_llm_scheduler(LLMScheduler(rate=0))
+
+
+def hedges_and_sheds():
+    return sum(LLM_HEDGES_FIRED.values.values()), sum(LLM_SHED.values.values())
+
+
+def complete_with_recent_p95(p95: float, latency: str):
+    async def scenario():
+        use_mock_llm(latency)
+        policy = LLMPolicy(budgets={"reply": 12.0}, fallback_model=None)
+        tracker = policy.latencies["reply"] = LatencyTracker()
+        for _ in range(HEDGE_MIN_SAMPLES):
+            tracker.record(p95)
+        before = hedges_and_sheds()
+        result = await policy.complete("reply", "Say something")
+        after = hedges_and_sheds()
+        return result, after[0] - before[0], after[1] - before[1]
+
+    return run_virtual(scenario())
+
+
+def test_hedge_fires_when_the_first_request_runs_past_p95():
+    result, hedges, sheds = complete_with_recent_p95(1.0, "fixed:3")
+    assert result
+    assert (hedges, sheds) == (1, 0)
+
+
+def test_no_hedge_when_p95_is_beyond_the_budget():
+    result, hedges, sheds = complete_with_recent_p95(15.0, "fixed:20")
+    assert result is None
+    assert (hedges, sheds) == (0, 0)
@@ -0,0 +1,97 @@
+"""Reply mailbox ordering and coalescing tests, run on virtual time: python -m pytest test_reply_mailbox.py"""
+import asyncio
+from reply_mailbox import ReplyMailbox
+from virtual_time import run_virtual
+
+
+class RecordingEngine:
+    """Just enough of GDEngine for the mailbox: records each reply round"""
+
+    def __init__(self, human_count: int, round_time: float = 1.0, fail_rounds=()):
+        self.session_id = "mailbox-test"
+        self.human_count = human_count
+        self.round_time = round_time
+        self.fail_rounds = set(fail_rounds)
+        self.rounds = []
+        self._reply_tasks = set()
+
+    async def _respond_to_messages(self, batch):
+        self.rounds.append([seq for seq, _, _ in batch])
+        await asyncio.sleep(self.round_time)
+        if len(self.rounds) in self.fail_rounds:
+            raise RuntimeError("LLM exploded")
+
+
+async def drain(engine: RecordingEngine):
+    while engine._reply_tasks:
+        await asyncio.gather(*engine._reply_tasks)
+
+
+def test_single_human_is_answered_without_waiting():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        engine = RecordingEngine(human_count=1)
+        mailbox = ReplyMailbox(engine)
+        started = loop.time()
+        mailbox.post(1, "YOU", "first")
+        await asyncio.sleep(0)
+        # No coalescing window with one human: the round starts immediately
+        assert engine.rounds == [[1]]
+        assert loop.time() == started
+
+        await drain(engine)
+        mailbox.post(2, "YOU", "second")
+        await drain(engine)
+        assert engine.rounds == [[1], [2]]
+
+    run_virtual(scenario())
+
+
+def test_messages_posted_during_a_round_share_the_next_one():
+    async def scenario():
+        engine = RecordingEngine(human_count=1, round_time=2.0)
+        mailbox = ReplyMailbox(engine)
+        mailbox.post(1, "YOU", "first")
+        await asyncio.sleep(0.5)
+        mailbox.post(2, "YOU", "second")
+        mailbox.post(3, "YOU", "third")
+        await drain(engine)
+        assert engine.rounds == [[1], [2, 3]]
+
+    run_virtual(scenario())
+
+
+def test_several_humans_coalesce_within_the_window_in_seq_order():
+    async def scenario():
+        engine = RecordingEngine(human_count=3)
+        mailbox = ReplyMailbox(engine, coalesce_window=0.25)
+        # Posted out of order: the round still answers them by sequence number
+        mailbox.post(3, "RAVI", "c")
+        await asyncio.sleep(0.1)
+        mailbox.post(1, "YOU", "a")
+        mailbox.post(2, "ANU", "b")
+        await asyncio.sleep(0.5)
+        # Outside the window of the first round, while it runs
+        mailbox.post(4, "YOU", "d")
+        await drain(engine)
+        assert engine.rounds == [[1, 2, 3], [4]]
+
+    run_virtual(scenario())
+
+
+def test_failed_round_does_not_strand_queued_mail():
+    async def scenario():
+        engine = RecordingEngine(human_count=1, round_time=1.0, fail_rounds={1})
+        mailbox = ReplyMailbox(engine)
+        mailbox.post(1, "YOU", "first")
+        await asyncio.sleep(0.5)
+        mailbox.post(2, "YOU", "second")
+        await drain(engine)
+        assert engine.rounds == [[1], [2]]
+
+        # The consumer finished cleanly and a later post starts a new one
+        mailbox.post(3, "YOU", "third")
+        await drain(engine)
+        assert engine.rounds == [[1], [2], [3]]
+
+    run_virtual(scenario())
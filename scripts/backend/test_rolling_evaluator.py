@@ -0,0 +1,59 @@
+"""Rolling evaluation tests, run on virtual time: python -m pytest test_rolling_evaluator.py"""
+import asyncio
+import httpx
+from gd_engine import GDEngine
+from llm_client import LLMClient, set_llm_client
+from llm_scheduler import LLMScheduler, set_llm_scheduler
+from mock_llm_server import MockLLMConfig, create_app
+from virtual_time import run_virtual
+
+
+def use_mock_llm():
+    app = create_app(MockLLMConfig(latency="fixed:2"))
+    set_llm_client(LLMClient(api_url="http://mock-llm/v1/chat/completions", transport=httpx.ASGITransport(app=app)))
+    set_llm_scheduler(LLMScheduler(rate=0))
+
+
+def rankings_by_name(evaluation):
+    return {entry["name"]: entry for entry in evaluation["rankings"]}
+
+
+def test_end_reports_immediately_then_refreshes_the_last_speaker():
+    async def scenario():
+        use_mock_llm()
+        loop = asyncio.get_running_loop()
+        engine = GDEngine("rolling", rolling_evaluation=True)
+        engine.seat_participants(["YOU"])
+        await engine.start_discussion()
+        events = engine.events.subscribe()
+        try:
+            # The first message is scored in the background; the last one is
+            # still inside the debounce window when the session ends
+            for text in ["Automation creates new kinds of jobs", "Retraining has to be funded publicly"]:
+                engine.add_message("YOU", text)
+                engine.track_participation("YOU", text)
+                await asyncio.sleep(10)
+            engine.add_message("YOU", "So policy should follow the data")
+            engine.track_participation("YOU", "So policy should follow the data")
+
+            started = loop.time()
+            result = await engine.end_discussion()
+            assert loop.time() - started < 1
+            assert rankings_by_name(result["evaluation"])["YOU"]["partial"]
+
+            await asyncio.sleep(60)
+            ready = []
+            while not events.empty():
+                event = events.get_nowait()
+                if event["type"] == "evaluation_ready":
+                    ready.append(event["data"])
+            return ready, engine.evaluation
+        finally:
+            engine.close()
+
+    ready, evaluation = run_virtual(scenario())
+    # The immediate report, then the refreshed one
+    assert len(ready) == 2
+    you = rankings_by_name(evaluation)["YOU"]
+    assert not you.get("partial")
+    assert rankings_by_name(ready[1])["YOU"] == you
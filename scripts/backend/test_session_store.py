@@ -0,0 +1,96 @@
+"""Session store tests: python -m pytest test_session_store.py"""
+import asyncio
+import sqlite3
+import httpx
+from gd_engine import GDEngine
+from llm_client import LLMClient, set_llm_client
+from llm_scheduler import LLMScheduler, set_llm_scheduler
+from mock_llm_server import MockLLMConfig, create_app
+from session_store import InMemorySessionStore, SQLiteSessionStore
+from virtual_time import run_virtual
+
+WRITE_LOCK_HELD = 0.3
+
+
+def test_contended_sqlite_write_does_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        store = SQLiteSessionStore(path)
+        engine = GDEngine("contended", rolling_evaluation=False)
+        engine.seat_default_participants()
+        await store.add(engine)
+
+        # Another worker holds the write lock for a while
+        other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        other.execute("BEGIN IMMEDIATE")
+        loop.call_later(WRITE_LOCK_HELD, other.execute, "COMMIT")
+
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        async with store.transaction("contended") as session:
+            session.add_message("YOU", "Automation creates new kinds of jobs")
+            session.version += 1
+        ticker.cancel()
+        other.close()
+        return ticks, store
+
+    ticks, store = asyncio.run(scenario())
+    # The loop kept running while the save waited for the lock
+    assert ticks >= 10
+    assert store._conn.execute("SELECT COUNT(*) FROM messages WHERE session_id = 'contended'").fetchone()[0] == 1
+
+
+def test_only_the_worker_that_deletes_a_session_gets_its_engine(tmp_path):
+    path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+        engine = GDEngine("shared", rolling_evaluation=False)
+        engine.seat_default_participants()
+        await first.add(engine)
+        assert second.get("shared") is not None
+        removed = await asyncio.gather(first.remove("shared"), second.remove("shared"))
+        return removed, len(first)
+
+    removed, remaining = asyncio.run(scenario())
+    assert sum(engine is not None for engine in removed) == 1
+    assert remaining == 0
+
+
+def test_removing_a_session_mid_evaluation_keeps_the_evaluation():
+    async def scenario():
+        app = create_app(MockLLMConfig(latency="fixed:5"))
+        set_llm_client(LLMClient(api_url="http://mock-llm/v1/chat/completions", transport=httpx.ASGITransport(app=app)))
+        set_llm_scheduler(LLMScheduler(rate=0))
+
+        archived = []
+        store = InMemorySessionStore(on_evict=archived.append, completed_ttl=0)
+        engine = GDEngine("ending", rolling_evaluation=False)
+        engine.seat_participants(["YOU"])
+        await store.add(engine)
+        await engine.start_discussion()
+        engine.add_message("YOU", "Automation creates new kinds of jobs")
+        engine.track_participation("YOU", "Automation creates new kinds of jobs")
+
+        ending = asyncio.create_task(engine.end_discussion())
+        await asyncio.sleep(1)
+        assert engine.status == "completed" and engine.evaluating
+        # The reaper leaves it alone until the evaluation is committed
+        assert await store.reap() == 0
+        removed = await store.remove("ending")
+        await ending
+        return removed, archived
+
+    removed, archived = run_virtual(scenario())
+    assert removed.evaluation is not None
+    assert removed.evaluation["rankings"]
+    assert archived == []
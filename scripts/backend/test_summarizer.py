@@ -0,0 +1,58 @@
+"""Transcript summarizer tests: python -m pytest test_summarizer.py"""
+import asyncio
+import httpx
+from gd_engine import GDEngine
+from llm_client import LLMClient, set_llm_client
+from llm_scheduler import LLMScheduler, set_llm_scheduler
+from mock_llm_server import MockLLMConfig, create_app
+from summarizer import CHUNK_WORDS
+from virtual_time import run_virtual
+
+SENTENCE = "Automation will reshape jobs, so training has to keep pace with it. "
+
+
+def use_mock_llm():
+    app = create_app(MockLLMConfig(latency="fixed:0.2"))
+    set_llm_client(LLMClient(api_url="http://mock-llm/v1/chat/completions", transport=httpx.ASGITransport(app=app)))
+    set_llm_scheduler(LLMScheduler(rate=0))
+
+
+def speak_past_threshold(engine: GDEngine, name: str):
+    words = 0
+    while words <= CHUNK_WORDS:
+        engine.add_message(name, SENTENCE)
+        engine.track_participation(name, SENTENCE)
+        words += len(SENTENCE.split())
+
+
+def test_tracking_without_an_event_loop_keeps_the_tail():
+    engine = GDEngine("summarizer", rolling_evaluation=False)
+    engine.add_participant("YOU", is_human=True)
+    engine.topic = "Automation and jobs"
+    speak_past_threshold(engine, "YOU")
+
+    # Nothing to fold on, so everything is still verbatim tail
+    assert engine.summarizer._digest("YOU").summarized_count == 0
+    assert not engine.summarizer._workers
+    assert "Recent messages" not in engine.summarizer.content("YOU")
+
+
+def test_tail_is_folded_once_a_loop_is_running():
+    engine = GDEngine("summarizer", rolling_evaluation=False)
+    engine.add_participant("YOU", is_human=True)
+    engine.topic = "Automation and jobs"
+    speak_past_threshold(engine, "YOU")
+    spoken = engine.participation_data["YOU"].speaking_count
+
+    async def scenario():
+        use_mock_llm()
+        # The next message picks up the tail left over from the loop-less calls
+        engine.add_message("YOU", SENTENCE)
+        engine.track_participation("YOU", SENTENCE)
+        assert engine.summarizer._workers
+        await asyncio.gather(*engine.summarizer._workers.values())
+
+    run_virtual(scenario())
+    digest = engine.summarizer._digest("YOU")
+    assert digest.summary
+    assert digest.summarized_count == spoken + 1
@@ -0,0 +1,120 @@
+"""Timer wheel and session timeline tests, run on virtual time: python -m pytest test_timer_wheel.py"""
+import asyncio
+import httpx
+from gd_engine import GDEngine
+from llm_client import LLMClient, set_llm_client
+from llm_scheduler import LLMScheduler, set_llm_scheduler
+from mock_llm_server import MockLLMConfig, create_app
+from timer_wheel import TimerWheel, get_timer_wheel
+from virtual_time import run_virtual
+
+
+def use_mock_llm():
+    app = create_app(MockLLMConfig(latency="fixed:0.2"))
+    set_llm_client(LLMClient(api_url="http://mock-llm/v1/chat/completions", transport=httpx.ASGITransport(app=app)))
+    set_llm_scheduler(LLMScheduler(rate=0))
+
+
+def test_timers_fire_within_one_tick_of_their_delay():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(tick=1.0, slots=8)
+        fired = {}
+        # Several delays wrap the 8-slot wheel more than once
+        delays = [0, 0.5, 1, 7.9, 8, 8.1, 23.5, 100]
+        for delay in delays:
+            wheel.schedule(delay, lambda delay=delay: fired.setdefault(delay, loop.time()))
+        assert len(wheel) == len(delays)
+
+        await asyncio.sleep(102)
+        assert sorted(fired) == delays
+        for delay, at in fired.items():
+            assert delay <= at <= delay + wheel.tick
+        assert len(wheel) == 0
+
+    run_virtual(scenario())
+
+
+def test_cancelled_timers_do_not_fire():
+    async def scenario():
+        wheel = TimerWheel(tick=1.0, slots=8)
+        fired = []
+        kept = wheel.schedule(3, lambda: fired.append("kept"))
+        dropped = wheel.schedule(3, lambda: fired.append("dropped"))
+        dropped.cancel()
+        # Cancelling twice is harmless
+        dropped.cancel()
+        assert len(wheel) == 1
+
+        await asyncio.sleep(5)
+        assert fired == ["kept"]
+        kept.cancel()
+        assert len(wheel) == 0
+
+    run_virtual(scenario())
+
+
+def test_ticker_stops_when_idle_and_restarts_on_schedule():
+    async def scenario():
+        wheel = TimerWheel(tick=1.0, slots=8)
+        fired = []
+        wheel.schedule(1, lambda: fired.append(1))
+        await asyncio.sleep(3)
+        assert wheel._ticker.done()
+
+        wheel.schedule(2, lambda: fired.append(2))
+        await asyncio.sleep(4)
+        assert fired == [1, 2]
+
+    run_virtual(scenario())
+
+
+def timeline(humans, time_limit, until):
+    """Run a session on virtual time and return (engine, events seen)"""
+    async def scenario():
+        use_mock_llm()
+        loop = asyncio.get_running_loop()
+        engine = GDEngine("timeline", rolling_evaluation=False)
+        engine.clock = lambda: 1_700_000_000 + loop.time()
+        engine.time_limit = time_limit
+        engine.seat_participants(humans)
+        events = engine.events.subscribe()
+        try:
+            await engine.start_discussion()
+            await asyncio.sleep(until)
+            seen = []
+            while not events.empty():
+                event = events.get_nowait()
+                seen.append((event["type"], event["data"], engine.get_elapsed_time()))
+            return engine, seen
+        finally:
+            engine.close()
+
+    return run_virtual(scenario())
+
+
+def test_injection_follows_human_count():
+    for humans, added in [(["YOU"], 2), (["YOU", "ANU"], 1), (["YOU", "ANU", "RAVI"], 0), ([], 0)]:
+        engine, _ = timeline(humans, time_limit=None, until=310)
+        assert engine.candidates_injected
+        assert engine.ai_count == max(0, 5 - len(humans)) + added
+
+
+def test_warning_then_end_at_time_limit():
+    engine, seen = timeline(["YOU"], time_limit=250, until=270)
+    warnings = [event for event in seen if event[0] == "time_warning"]
+    assert len(warnings) == 1
+    assert 119 <= warnings[0][1]["remaining"] <= 120
+
+    assert engine.status == "completed"
+    assert engine.evaluation is not None
+    assert any("minutes remain" in message.text for message in engine.messages)
+    # Ending disarmed the injection timer along with the rest
+    assert not engine.candidates_injected
+    assert len(get_timer_wheel()) == 0
+
+
+def test_no_time_limit_keeps_session_running():
+    engine, seen = timeline(["YOU"], time_limit=None, until=900)
+    assert engine.status == "in_progress"
+    assert not any(event[0] == "time_warning" for event in seen)
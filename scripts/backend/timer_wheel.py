@@ -0,0 +1,106 @@
+import asyncio
+from typing import Callable, List, Optional, Set
+from metrics import SESSION_TIMERS_PENDING
+
+# Resolution of the wheel: timers fire up to one tick after their delay
+TIMER_TICK = 1.0
+# Slots per revolution; longer delays wait out whole revolutions in their slot
+TIMER_SLOTS = 512
+
+
+class TimerHandle:
+    """A scheduled callback; cancel() removes it from its slot"""
+
+    __slots__ = ("callback", "rounds", "slot", "wheel")
+
+    def __init__(self, wheel: "TimerWheel", callback: Callable[[], None], rounds: int, slot: int):
+        self.wheel = wheel
+        self.callback = callback
+        self.rounds = rounds
+        self.slot = slot
+
+    def cancel(self):
+        if self.wheel is not None:
+            self.wheel._remove(self)
+
+
+class TimerWheel:
+    """Hashed timing wheel shared by every session in the process
+
+    Scheduling and cancelling are O(1) set operations regardless of how many
+    timers are pending, and a single task advances the wheel one slot per
+    tick instead of one asyncio timer per session event. The task only runs
+    while timers are pending. Callbacks run on the event loop and should
+    spawn a task for anything asynchronous.
+    """
+
+    def __init__(self, tick: float = TIMER_TICK, slots: int = TIMER_SLOTS):
+        self.tick = tick
+        self._slots: List[Set[TimerHandle]] = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._pending = 0
+        self._ticker: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        """Run callback once, between delay and delay + tick seconds from now"""
+        # The next tick may be almost due already, so count whole ticks from it
+        ticks = int(max(0.0, delay) // self.tick) + 1
+        rounds, offset = divmod(ticks - 1, len(self._slots))
+        slot = (self._cursor + 1 + offset) % len(self._slots)
+
+        handle = TimerHandle(self, callback, rounds, slot)
+        self._slots[slot].add(handle)
+        self._pending += 1
+
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._run())
+        return handle
+
+    def _remove(self, handle: TimerHandle):
+        self._slots[handle.slot].discard(handle)
+        handle.wheel = None
+        self._pending -= 1
+
+    def _advance(self):
+        """Move to the next slot and fire the timers due in it"""
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        loop = asyncio.get_running_loop()
+        for handle in list(self._slots[self._cursor]):
+            if handle.rounds:
+                handle.rounds -= 1
+                continue
+            self._remove(handle)
+            # Errors are reported by the loop without stopping the wheel
+            loop.call_soon(handle.callback)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        while self._pending:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            # Catch up on ticks missed while the loop was busy
+            while loop.time() >= next_tick and self._pending:
+                self._advance()
+                next_tick += self.tick
+
+    def close(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+
+
+_shared_wheel: Optional[TimerWheel] = None
+
+
+def get_timer_wheel() -> TimerWheel:
+    """Return the process-wide wheel that session deadlines are scheduled on"""
+    global _shared_wheel
+    if _shared_wheel is None:
+        _shared_wheel = TimerWheel()
+    return _shared_wheel
+
+
+SESSION_TIMERS_PENDING.set_function(lambda: len(_shared_wheel) if _shared_wheel is not None else 0)
@@ -0,0 +1,115 @@
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+def parse_timestamp(value: Optional[str]) -> float:
+    """Convert a client ISO timestamp to epoch seconds, falling back to now"""
+    if value:
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def format_timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value).isoformat()
+
+
+class Message:
+    """One transcript entry; the speaker is an integer participant id"""
+
+    __slots__ = ("seq", "speaker", "text", "time")
+
+    def __init__(self, seq: int, speaker: int, text: str, time: float):
+        self.seq = seq
+        self.speaker = speaker
+        self.text = text
+        self.time = time
+
+
+class ParticipantStats:
+    """Running participation metrics for one participant"""
+
+    __slots__ = ("speaker", "entry_time", "speaking_count", "word_count")
+
+    def __init__(self, speaker: int):
+        self.speaker = speaker
+        self.entry_time: Optional[float] = None
+        self.speaking_count = 0
+        self.word_count = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "entry_time": self.entry_time,
+            "speaking_count": self.speaking_count,
+            "word_count": self.word_count
+        }
+
+    def load(self, data: Dict):
+        self.entry_time = data["entry_time"]
+        self.speaking_count = data["speaking_count"]
+        self.word_count = data["word_count"]
+
+
+class Transcript:
+    """Append-only session transcript
+
+    Each message's text is stored once. Speakers are interned to integer ids,
+    and every speaker has an index array pointing at their messages.
+    Message seq equals position + 1.
+    """
+
+    def __init__(self):
+        self.speakers: List[str] = []
+        self._speaker_ids: Dict[str, int] = {}
+        self.records: List[Message] = []
+        self._by_speaker: List[array] = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def speaker_id(self, name: str) -> int:
+        """Intern a participant name"""
+        speaker = self._speaker_ids.get(name)
+        if speaker is None:
+            speaker = len(self.speakers)
+            self._speaker_ids[name] = speaker
+            self.speakers.append(name)
+            self._by_speaker.append(array("I"))
+        return speaker
+
+    def append(self, name: str, text: str, timestamp: float) -> Message:
+        speaker = self.speaker_id(name)
+        message = Message(len(self.records) + 1, speaker, text, timestamp)
+        self._by_speaker[speaker].append(len(self.records))
+        self.records.append(message)
+        return message
+
+    def as_dict(self, message: Message) -> Dict:
+        """API representation of a message"""
+        return {
+            "seq": message.seq,
+            "participant": self.speakers[message.speaker],
+            "message": message.text,
+            "timestamp": format_timestamp(message.time)
+        }
+
+    def as_dicts(self, start: int = 0) -> List[Dict]:
+        """Messages from position start onwards (i.e. seq > start)"""
+        return [self.as_dict(message) for message in self.records[max(start, 0):]]
+
+    def recent(self, count: int) -> List[Dict]:
+        return self.as_dicts(len(self.records) - count)
+
+    def texts_by(self, name: str) -> List[str]:
+        """Everything a participant has said, in order"""
+        speaker = self._speaker_ids.get(name)
+        if speaker is None:
+            return []
+        return [self.records[idx].text for idx in self._by_speaker[speaker]]
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self.records)
@@ -0,0 +1,136 @@
+import asyncio
+import random
+from typing import TYPE_CHECKING, Optional
+from ai_agents import CandidateAgent
+
+if TYPE_CHECKING:
+    from gd_engine import GDEngine
+
+# Mean gap between unprompted AI turns, randomised by +/- TURN_JITTER
+AUTONOMOUS_TURN_INTERVAL = 8.0
+TURN_JITTER = 0.5
+# AI candidates leave the floor to humans for this long after they speak or type
+HUMAN_BACKOFF = 10.0
+# Unprompted AI turns in a row before waiting for a human to speak
+MAX_UNPROMPTED_TURNS = 4
+
+
+class TurnScheduler:
+    """Background loop that lets AI candidates speak without waiting for a human message
+
+    Turns go through the engine's transcript and event bus like any other
+    message. The loop backs off while humans are speaking or typing, waits
+    for reactive replies already in flight, and pauses after a few turns in a
+    row so an unattended session doesn't talk forever.
+    """
+
+    def __init__(
+        self,
+        engine: "GDEngine",
+        interval: float = AUTONOMOUS_TURN_INTERVAL,
+        human_backoff: float = HUMAN_BACKOFF,
+        max_unprompted_turns: int = MAX_UNPROMPTED_TURNS
+    ):
+        self.engine = engine
+        self.interval = interval
+        self.human_backoff = human_backoff
+        self.max_unprompted_turns = max_unprompted_turns
+
+        self.turns = 0
+        self.unprompted_turns = 0
+        self.last_human_activity = self._now()
+        self._next_turn_at = self.last_human_activity + self._gap()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _now() -> float:
+        # The loop's clock, so simulations running on virtual time pace turns correctly
+        return asyncio.get_running_loop().time()
+
+    def _gap(self) -> float:
+        return self.interval * random.uniform(1 - TURN_JITTER, 1 + TURN_JITTER)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def on_human_activity(self):
+        """A human spoke or is typing: give them the floor and reset the unprompted run"""
+        self.last_human_activity = self._now()
+        self.unprompted_turns = 0
+        self._wake.set()
+
+    def _delay(self) -> Optional[float]:
+        """Seconds until the next turn, or None to wait for a human"""
+        if self.unprompted_turns >= self.max_unprompted_turns:
+            return None
+        turn_at = max(self._next_turn_at, self.last_human_activity + self.human_backoff)
+        return max(0.0, turn_at - self._now())
+
+    async def _run(self):
+        engine = self.engine
+
+        while engine.status == "in_progress":
+            self._wake.clear()
+            delay = self._delay()
+
+            # Human activity wakes the loop early so the delay is recomputed
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            # Let reactive replies finish before taking an unprompted turn
+            if engine._reply_tasks:
+                await asyncio.wait(list(engine._reply_tasks))
+                self._next_turn_at = self._now() + self._gap()
+                continue
+
+            await self._take_turn()
+            self._next_turn_at = self._now() + self._gap()
+
+    def pick_speaker(self) -> Optional[CandidateAgent]:
+        """Least active candidate, never the one who spoke last"""
+        engine = self.engine
+        last_speaker = None
+        if len(engine.messages):
+            last_speaker = engine.messages.speakers[engine.messages.records[-1].speaker]
+
+        agents = [agent for agent in engine.candidate_agents if agent.name != last_speaker]
+        if not agents:
+            return None
+        random.shuffle(agents)
+        return min(agents, key=lambda agent: engine.participation_data[agent.name].speaking_count)
+
+    async def _take_turn(self):
+        engine = self.engine
+        agent = self.pick_speaker()
+        if agent is None:
+            return
+
+        context = engine.messages.recent(5)
+        prompt_from = context[-1]["message"] if context else engine.topic
+
+        if engine.streaming:
+            await engine._stream_ai_response(agent, context, prompt_from)
+        else:
+            reply = await agent.generate_response(
+                topic=engine.topic,
+                discussion_context=context,
+                human_input=prompt_from
+            )
+            async with engine.transaction():
+                if engine.status != "in_progress":
+                    return
+                engine.add_message(agent.name, reply)
+                engine.track_participation(agent.name, reply)
+
+        self.turns += 1
+        self.unprompted_turns += 1
@@ -0,0 +1,37 @@
+"""Virtual-time event loop for simulations and tests.
+
+With the in-process mock LLM every await is driven by the loop's own timers,
+so the clock can jump straight to the next one instead of waiting for it.
+"""
+import asyncio
+from typing import Any, Coroutine
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock jumps to the next timer whenever nothing is ready to run
+
+    Only valid while every awaited operation is driven by the loop's own
+    timers and callbacks (the in-process mock LLM), never real network I/O:
+    the clock would skip past it. Relies on BaseEventLoop's _ready and
+    _scheduled queues.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._now = 0.0
+
+    def time(self) -> float:
+        return self._now
+
+    def _run_once(self):
+        if not self._ready:
+            timers = [handle.when() for handle in self._scheduled if not handle.cancelled()]
+            if timers:
+                self._now = max(self._now, min(timers))
+        super()._run_once()
+
+
+def run_virtual(coro: Coroutine) -> Any:
+    """Run coro to completion on a fresh virtual-time loop"""
+    with asyncio.Runner(loop_factory=VirtualTimeLoop) as runner:
+        return runner.run(coro)